@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_pymongo import PyMongo
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
@@ -12,7 +12,12 @@ jwt = JWTManager()
 bcrypt = Bcrypt()
 mail = Mail()
 
-def create_app():
+def create_app(start_background=True):
+    """
+    Build the app. With start_background=False the per-process threads
+    (invalidation listener, mail workers) are left to the caller, e.g. a
+    pre-fork server starting them in each worker (see gunicorn.conf.py).
+    """
     load_dotenv()
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": [
@@ -25,14 +30,39 @@ def create_app():
     app.config["MAIL_USE_TLS"] = os.getenv("MAIL_USE_TLS") == "True"
     app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
     app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
-    app.config["MONGO_URI"] = os.getenv("MONGO_URI")
+    app.config["MAIL_QUEUE_WORKERS"] = int(os.getenv("MAIL_QUEUE_WORKERS", 2))
+    from .utils.read_routing import mongo_settings
+    app.config.update(mongo_settings())
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY") or "super-secret-key"
-    mongo.init_app(app)
+    # Where quiz payloads are validated: "both" (default), "app" or "db"
+    app.config["QUIZ_VALIDATOR"] = os.getenv("QUIZ_VALIDATOR", "both")
+    # Opt-in slow-query log: threshold in ms, 0/unset disables it
+    app.config["SLOW_QUERY_MS"] = float(os.getenv("SLOW_QUERY_MS", 0))
+    app.config["SLOW_QUERY_EXPLAIN"] = os.getenv("SLOW_QUERY_EXPLAIN", "True") == "True"
+    from .utils import hashing
+    hashing.configure(app)
+    from .utils.metrics import init_metrics, mongo_listener
+    from .utils.slow_queries import slow_query_listeners
+    from .utils.read_routing import client_options, init_read_routing, write_time_listener
+    from .utils.lifecycle import init_mongo, start_background_tasks
+    init_mongo(
+        app,
+        event_listeners=[mongo_listener, write_time_listener] + slow_query_listeners(app),
+        **client_options(app.config)
+    )
+    init_read_routing(app)
+    # after PyMongo, whose init_app installs its own BSON provider
+    from .utils.json_provider import init_json
+    init_json(app)
+    init_metrics(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
     mail.init_app(app) 
-    from .db_init.collections import create_collections
-    create_collections()
+    # Collections, validators and indexes are owned by `flask db init/migrate`
+    from .db_init.schema import init_schema_check
+    init_schema_check(app)
+    if start_background:
+        start_background_tasks(app)
         
    
     from app.routes.routes import main
@@ -46,4 +76,12 @@ def create_app():
     app.register_blueprint(users, url_prefix="/users")
     app.register_blueprint(quiz_bp,url_prefix="/quiz")
 
+    @app.errorhandler(hashing.HashingBusy)
+    def hashing_busy(err):
+        return jsonify({"msg": str(err)}), 503, {"Retry-After": "1"}
+
+    from .cli import attempts_cli, db_cli
+    app.cli.add_command(attempts_cli)
+    app.cli.add_command(db_cli)
+
     return app
@@ -0,0 +1,282 @@
+"""
+Async read path for the quiz endpoints, as a plain ASGI app over PyMongo's
+AsyncMongoClient:
+
+    GET /quiz/quizzes         same params, body and ETag as the Flask view
+    GET /quiz/quizzes/<id>    same body, ETag and Last-Modified
+
+Query building, params validation and response shapes are shared with the
+Flask app (QuizService, QuizListQuerySchema), so the two stay in step. It
+runs as a separate process next to the WSGI app (see asgi.py) with the
+proxy sending these two GET routes here; everything else answers 404.
+
+Only the public representation is served (no correct_answer). The quiz
+owner's and admins' view of a quiz comes from the Flask app, so detail
+GETs carrying an Authorization header should stay on the WSGI app.
+"""
+import json
+import os
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl
+from bson import ObjectId
+from dotenv import load_dotenv
+from marshmallow import ValidationError
+from pymongo import AsyncMongoClient
+from pymongo.read_concern import ReadConcern
+from .schemas.quiz_schema import QuizListQuerySchema
+from .services.quiz_service import QuizService, LIST_PROJECTION, CURSOR_PROJECTION, PUBLIC_DETAIL_PROJECTION
+from .utils.cache import TTLCache
+from .utils.conditional import make_etag
+from .utils.cursor import decode_cursor, keyset_query
+from .utils.json_provider import dumps_bytes
+from .utils.read_routing import client_options, mongo_settings, read_preference
+
+LIST_PATH = "/quiz/quizzes"
+
+list_query_schema = QuizListQuerySchema()
+# Totals per filter; this process sees no quiz writes, so only the TTL applies
+count_cache = TTLCache(ttl=int(os.getenv("QUIZ_COUNT_CACHE_TTL", 30)), maxsize=512)
+
+
+class AsyncQuizReads:
+    """
+    Async counterparts of the Quiz model reads used by the two endpoints.
+    The version lookups behind ETags go to primary (defaults to db), so a
+    lagging secondary cannot answer 304 for a representation that changed.
+    """
+
+    def __init__(self, db, session=None, primary=None):
+        self.db = db
+        self.session = session
+        self.primary = primary if primary is not None else db
+
+    async def list_version(self):
+        doc = await self.primary.counters.find_one({"_id": "quizzes"}, {"version": 1}, session=self.session)
+        return doc["version"] if doc else 0
+
+    async def count(self, query, mode):
+        # same modes as Quiz.count
+        if mode == "none":
+            return None
+        if mode == "approx" and not query:
+            return await self.db.quizzes.estimated_document_count()
+        key = json.dumps(query, sort_keys=True, default=str)
+        total = count_cache.get(key)
+        if total is None:
+            total = await self.db.quizzes.count_documents(query, session=self.session)
+            count_cache.set(key, total)
+        return total
+
+    async def find_page(self, query, skip, limit, direction):
+        cursor = (
+            self.db.quizzes
+            .find(query, LIST_PROJECTION, session=self.session)
+            .sort([("created_at", direction), ("_id", direction)])
+            .skip(skip)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    async def find_after(self, query, after, limit, direction):
+        cursor = (
+            self.db.quizzes
+            .find(keyset_query(query, after, direction), CURSOR_PROJECTION, session=self.session)
+            .sort([("created_at", direction), ("_id", direction)])
+            .limit(limit + 1)
+        )
+        items = await cursor.to_list(length=limit + 1)
+        return items[:limit], len(items) > limit
+
+    async def find_updated_at(self, quiz_id):
+        return await self.primary.quizzes.find_one(
+            {"_id": ObjectId(quiz_id)}, {"updated_at": 1}, session=self.session
+        )
+
+    async def find_by_id(self, quiz_id, projection=None):
+        return await self.db.quizzes.find_one({"_id": ObjectId(quiz_id)}, projection, session=self.session)
+
+
+def _etag_matches(headers, etag):
+    value = headers.get("if-none-match")
+    if not value:
+        return None
+    tags = [tag.strip().removeprefix("W/").strip('"') for tag in value.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _not_modified_since(headers, last_modified):
+    value = headers.get("if-modified-since")
+    if not value or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _validators(etag, last_modified=None):
+    headers = [("etag", f'"{etag}"'), ("cache-control", "no-cache")]
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers.append(("last-modified", format_datetime(last_modified, usegmt=True)))
+    return headers
+
+
+async def list_quizzes(reads, args, headers):
+    """
+    GET /quiz/quizzes. Returns (status, body, extra headers).
+    """
+    try:
+        params = list_query_schema.load(args)
+    except ValidationError as err:
+        return 400, {"errors": err.messages}, []
+
+    query, direction, error = QuizService.build_list_query(params)
+    if error:
+        return 400, {"error": error}, []
+
+    etag = make_etag(await reads.list_version(), sorted(params.items()))
+    if _etag_matches(headers, etag):
+        return 304, None, _validators(etag)
+
+    limit = params["limit"]
+    if "cursor" in params:
+        after = None
+        if params["cursor"]:
+            after, error = decode_cursor(params["cursor"])
+            if error:
+                return 400, {"error": error}, []
+        items, has_more = await reads.find_after(query, after, limit, direction)
+        result = QuizService.cursor_result(limit, items, has_more)
+    else:
+        page = params["page"]
+        total = await reads.count(query, params["count"])
+        items = await reads.find_page(query, (page - 1) * limit, limit, direction)
+        result = QuizService.page_result(page, limit, total, items)
+
+    return 200, result, _validators(etag)
+
+
+async def get_quiz(reads, quiz_id, headers):
+    """
+    GET /quiz/quizzes/<id>. Returns (status, body, extra headers).
+    """
+    if not ObjectId.is_valid(quiz_id):
+        return 404, {"error": "Quiz not found"}, []
+
+    if headers.get("if-none-match") or headers.get("if-modified-since"):
+        version = await reads.find_updated_at(quiz_id)
+        if version:
+            etag = make_etag(version["_id"], version.get("updated_at"))
+            matches = _etag_matches(headers, etag)
+            if matches or (matches is None and _not_modified_since(headers, version.get("updated_at"))):
+                return 304, None, _validators(etag, version.get("updated_at")) + [("vary", "Authorization")]
+
+    quiz = await reads.find_by_id(quiz_id, PUBLIC_DETAIL_PROJECTION)
+    if not quiz:
+        return 404, {"error": "Quiz not found"}, []
+
+    etag = make_etag(quiz["_id"], quiz.get("updated_at"))
+    # same Vary as the Flask view, which adds answers for the owner
+    return 200, quiz, _validators(etag, quiz.get("updated_at")) + [("vary", "Authorization")]
+
+
+class QuizReadApp:
+    """
+    ASGI callable. The client is created on lifespan startup (or the first
+    request), so each server process gets its own.
+
+    With MONGO_READ_PREFERENCE set, only anonymous requests are routed to
+    secondaries. This process does not see the callers' write times that
+    causal_reads uses, so requests with an Authorization header read from
+    the primary to keep read-your-own-writes.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or mongo_settings()
+        self.client = None
+        self.db = None
+        self.primary = None
+        self.read_preference = read_preference(self.config.get("MONGO_READ_PREFERENCE", "primary"))
+
+    def connect(self):
+        if self.client is None:
+            self.client = AsyncMongoClient(self.config["MONGO_URI"], **client_options(self.config))
+            self.primary = self.db = self.client.get_default_database()
+            if self.read_preference is not None:
+                self.primary = self.primary.with_options(read_concern=ReadConcern("majority"))
+                self.db = self.primary.with_options(read_preference=self.read_preference)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = self.db = self.primary = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.connect()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, send):
+        path = scope["path"].rstrip("/")
+        if path != LIST_PATH and not path.startswith(LIST_PATH + "/"):
+            return await self._respond(send, 404, {"error": "Not found"})
+        if scope["method"] not in ("GET", "HEAD"):
+            return await self._respond(send, 405, {"error": "Method not allowed"}, [("allow", "GET, HEAD")])
+
+        quiz_id = path[len(LIST_PATH) + 1:] if path != LIST_PATH else None
+        if quiz_id is not None and "/" in quiz_id:
+            return await self._respond(send, 404, {"error": "Not found"})
+
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        self.connect()
+        if self.read_preference is None or "authorization" in headers:
+            reads = AsyncQuizReads(self.primary)
+            status, body, extra = await self._dispatch(reads, quiz_id, scope, headers)
+        else:
+            # one causal session per request: the version is read on the primary
+            # first, and the secondary reads that follow wait until they have it
+            async with self.client.start_session(causal_consistency=True) as session:
+                reads = AsyncQuizReads(self.db, session, primary=self.primary)
+                status, body, extra = await self._dispatch(reads, quiz_id, scope, headers)
+        await self._respond(send, status, body, extra, head=scope["method"] == "HEAD")
+
+    async def _dispatch(self, reads, quiz_id, scope, headers):
+        if quiz_id is not None:
+            return await get_quiz(reads, quiz_id, headers)
+        args = {}
+        for name, value in parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True):
+            args.setdefault(name, value)
+        return await list_quizzes(reads, args, headers)
+
+    @staticmethod
+    async def _respond(send, status, body, extra=(), head=False):
+        payload = b"" if body is None else dumps_bytes(body)
+        headers = [(b"content-length", str(len(payload)).encode())]
+        if body is not None:
+            headers.append((b"content-type", b"application/json"))
+        headers += [(name.encode("latin-1"), value.encode("latin-1")) for name, value in extra]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if head else payload})
+
+
+def create_asgi_app():
+    load_dotenv()
+    return QuizReadApp()
@@ -0,0 +1,76 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from . import mongo
+from .db_init.indexes import diff_indexes
+from .db_init.schema import SCHEMA_VERSION, init_schema, migrate_schema, stored_version
+from .services.attempt_ingest import ingest_attempts, BATCH_SIZE
+from .models.quiz_stats import QuizStats
+
+attempts_cli = AppGroup("attempts", help="Quiz attempt maintenance commands.")
+
+
+@attempts_cli.command("import")
+@click.argument("path", type=click.File("rb"))
+@click.option("--batch-size", default=BATCH_SIZE, show_default=True, help="Documents per insert_many.")
+def import_attempts(path, batch_size):
+    """Import NDJSON attempts from PATH ("-" for stdin)."""
+    report = ingest_attempts(path, batch_size=batch_size)
+    click.echo(f"inserted={report['inserted']} failed={report['failed']}")
+    for error in report["errors"]:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    if report["errors_truncated"]:
+        click.echo("(more errors not shown)", err=True)
+
+
+@attempts_cli.command("rebuild-stats")
+@click.option("--quiz-id", default=None, help="Rebuild a single quiz (default: all).")
+@click.option("--batch-size", default=500, show_default=True, help="Stats documents written per bulk_write.")
+def rebuild_stats(quiz_id, batch_size):
+    """Recompute quiz_stats from quiz_attempts."""
+    rebuilt = QuizStats.rebuild(quiz_id=quiz_id, batch_size=batch_size)
+    click.echo(f"rebuilt={rebuilt}")
+
+
+db_cli = AppGroup("db", help="Database schema commands.")
+
+
+def _quiz_validator(value):
+    return value or current_app.config["QUIZ_VALIDATOR"]
+
+
+def _echo_index_report(report, applied=False):
+    # after ensure_indexes, "missing" indexes have just been created
+    labels = {"missing": "created" if applied else "missing", "changed": "changed", "extra": "extra"}
+    for coll_name, drift in report.items():
+        for kind, label in labels.items():
+            for name in drift[kind]:
+                click.echo(f"{coll_name}.{name}: {label}")
+
+
+@db_cli.command("init")
+@click.option("--quiz-validator", type=click.Choice(["both", "app", "db"]), default=None,
+              help="Quiz validation mode (default: QUIZ_VALIDATOR).")
+def db_init(quiz_validator):
+    """Create collections, validators and indexes on a new database."""
+    report = init_schema(mongo.db, _quiz_validator(quiz_validator))
+    _echo_index_report(report, applied=True)
+    click.echo(f"schema_version={SCHEMA_VERSION}")
+
+
+@db_cli.command("migrate")
+@click.option("--quiz-validator", type=click.Choice(["both", "app", "db"]), default=None,
+              help="Quiz validation mode (default: QUIZ_VALIDATOR).")
+def db_migrate(quiz_validator):
+    """Bring an existing database up to the current schema version."""
+    previous = stored_version(mongo.db)
+    report = migrate_schema(mongo.db, _quiz_validator(quiz_validator))
+    _echo_index_report(report, applied=True)
+    click.echo(f"schema_version={previous}->{SCHEMA_VERSION}")
+
+
+@db_cli.command("status")
+def db_status():
+    """Show the stored schema version and index drift."""
+    click.echo(f"schema_version={stored_version(mongo.db)} expected={SCHEMA_VERSION}")
+    _echo_index_report(diff_indexes(mongo.db))
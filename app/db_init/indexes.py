@@ -0,0 +1,108 @@
+import logging
+from pymongo import ASCENDING, DESCENDING
+
+logger = logging.getLogger(__name__)
+
+# Declared indexes per collection: name -> (keys, options)
+# Names are explicit so reconciliation can match them against what is
+# already on the server, independently of key order in index_information().
+INDEXES = {
+    "users": {
+        "email_unique": ([("email", ASCENDING)], {"unique": True}),
+        # GET /users/users listing and its role / class_level filters
+        "created_desc": ([("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "roles_created": ([("roles", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "class_level_created": ([("class_level", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "roles_class_level_created": ([("roles", ASCENDING), ("class_level", ASCENDING),
+                                       ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    },
+    "quizzes": {
+        # Quiz.save upserts on (title, teacher_id)
+        "teacher_title_unique": ([("teacher_id", ASCENDING), ("title", ASCENDING)], {"unique": True}),
+        # Default listing order
+        "created_desc": ([("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        # Listing filters, each followed by the listing order
+        "teacher_created": ([("teacher_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "class_level_created": ([("class_level", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "subject_created": ([("Subject", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "quiz_type_created": ([("quiz_type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "status_created": ([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "class_level_subject_created": ([("class_level", ASCENDING), ("Subject", ASCENDING),
+                                         ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        "class_level_quiz_type_created": ([("class_level", ASCENDING), ("quiz_type", ASCENDING),
+                                           ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+    },
+    "otp_codes": {
+        "email_purpose_unique": ([("email", ASCENDING), ("purpose", ASCENDING)], {"unique": True}),
+        # Mongo removes codes once expires_at has passed
+        "expires_ttl": ([("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    },
+    "mail_queue": {
+        # MailWorker claims the oldest due message
+        "status_next_attempt": ([("status", ASCENDING), ("next_attempt_at", ASCENDING)], {}),
+        # Sent and dead-lettered messages are purged after a retention window
+        "sent_ttl": ([("sent_at", ASCENDING)], {"expireAfterSeconds": 24 * 3600}),
+        "dead_ttl": ([("dead_at", ASCENDING)], {"expireAfterSeconds": 7 * 24 * 3600}),
+    },
+    "quiz_attempts": {
+        "quiz_student": ([("quiz_id", ASCENDING), ("student_id", ASCENDING)], {}),
+        "student_submitted": ([("student_id", ASCENDING), ("submitted_at", DESCENDING)], {}),
+    },
+}
+
+# Options compared when deciding whether an existing index matches its declaration
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _normalize_keys(keys):
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction)
+            for field, direction in keys]
+
+
+def diff_indexes(db, indexes=None):
+    """
+    Compare declared indexes with the ones present on the server.
+    Returns a dict per collection with "missing", "changed" and "extra" names.
+    """
+    indexes = indexes or INDEXES
+    report = {}
+    for coll_name, declared in indexes.items():
+        existing = db[coll_name].index_information()
+        missing, changed = [], []
+        for name, (keys, options) in declared.items():
+            info = existing.get(name)
+            if info is None:
+                missing.append(name)
+                continue
+            same_keys = _normalize_keys(info["key"]) == _normalize_keys(keys)
+            same_options = all(info.get(opt) == options.get(opt) for opt in _COMPARED_OPTIONS
+                               if opt in options or opt in info)
+            if not (same_keys and same_options):
+                changed.append(name)
+        extra = [name for name in existing if name != "_id_" and name not in declared]
+        report[coll_name] = {"missing": missing, "changed": changed, "extra": extra}
+    return report
+
+
+def ensure_indexes(db, indexes=None):
+    """
+    Idempotently create missing indexes and report drift.
+    Changed or extra indexes are only logged, never dropped: dropping
+    an index on a live collection is left to an explicit operator action.
+    """
+    indexes = indexes or INDEXES
+    report = diff_indexes(db, indexes)
+    for coll_name, drift in report.items():
+        for name in drift["changed"]:
+            logger.warning("Index drift on %s.%s: definition differs from declaration", coll_name, name)
+        for name in drift["extra"]:
+            logger.info("Undeclared index on %s.%s", coll_name, name)
+        for name in drift["missing"]:
+            keys, options = indexes[coll_name][name]
+            try:
+                db[coll_name].create_index(keys, name=name, **options)
+                logger.info("Created index %s.%s", coll_name, name)
+            except Exception as e:
+                logger.error("Failed to create index %s.%s: %s", coll_name, name, e)
+    return report
+
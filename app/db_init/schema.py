@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime, timezone
+from flask import jsonify
+from .collections import create_collections, update_validators
+from .indexes import ensure_indexes
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever collections, validators or INDEXES change, so running
+# workers can tell that `flask db migrate` has not been applied yet.
+SCHEMA_VERSION = 3
+META_COLLECTION = "schema_meta"
+
+_checked = None
+_reported = False  # last (version, quiz_validator) logged as a mismatch
+
+
+def stored_version(db):
+    doc = db[META_COLLECTION].find_one({"_id": "schema"}, {"version": 1})
+    return doc["version"] if doc else None
+
+
+def _record_version(db, quiz_validator):
+    db[META_COLLECTION].update_one(
+        {"_id": "schema"},
+        {"$set": {
+            "version": SCHEMA_VERSION,
+            "quiz_validator": quiz_validator,
+            "applied_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+
+
+def init_schema(db, quiz_validator="both"):
+    """
+    Create missing collections (with validators), the invalidation
+    collection and every declared index, then record SCHEMA_VERSION.
+    Returns the index report from ensure_indexes.
+    """
+    create_collections(quiz_validator, db=db)
+    report = ensure_indexes(db)
+    _record_version(db, quiz_validator)
+    return report
+
+
+def backfill_created_at(db):
+    """
+    Set created_at from the ObjectId timestamp on users that lack it, so
+    the keyset listing on (created_at, _id) sees them. Returns the number
+    of users updated.
+    """
+    updated = 0
+    for user in db.users.find({"created_at": {"$exists": False}}, {"_id": 1}):
+        db.users.update_one(
+            {"_id": user["_id"], "created_at": {"$exists": False}},
+            {"$set": {"created_at": user["_id"].generation_time}}
+        )
+        updated += 1
+    return updated
+
+
+def migrate_schema(db, quiz_validator="both"):
+    """
+    Bring an existing database up to SCHEMA_VERSION: same as init_schema,
+    plus the declared validators are re-applied to collections that
+    already exist and older documents are backfilled.
+    """
+    create_collections(quiz_validator, db=db)
+    # before the validators, which now require created_at
+    backfill_created_at(db)
+    update_validators(db)
+    report = ensure_indexes(db)
+    _record_version(db, quiz_validator)
+    return report
+
+
+def check_schema_version(db, quiz_validator=None):
+    """
+    Compare the stored schema with SCHEMA_VERSION and, when given, the
+    quiz_validator mode it was applied with. Returns (ok, stored_version).
+    A match is cached for the life of the process; a mismatch is looked
+    up again on the next call, so workers recover once `flask db
+    init/migrate` has run.
+    """
+    global _checked, _reported
+    if _checked is not None:
+        return _checked
+    doc = db[META_COLLECTION].find_one({"_id": "schema"}, {"version": 1, "quiz_validator": 1}) or {}
+    version, stored_validator = doc.get("version"), doc.get("quiz_validator")
+    current = version is not None and version >= SCHEMA_VERSION
+    # the quizzes validationLevel was fixed by the mode used at init/migrate time
+    ok = current and (quiz_validator is None or stored_validator == quiz_validator)
+    if ok:
+        _checked = (ok, version)
+    elif (version, stored_validator) != _reported:
+        _reported = (version, stored_validator)
+        if version is None:
+            logger.error("Database schema not initialized, run `flask db init`")
+        elif not current:
+            logger.error("Database schema is at version %s, expected %s: run `flask db migrate`",
+                         version, SCHEMA_VERSION)
+        else:
+            logger.error("Database schema was applied with quiz validator %r but QUIZ_VALIDATOR is %r: "
+                         "run `flask db migrate --quiz-validator %s`",
+                         stored_validator, quiz_validator, quiz_validator)
+    return ok, version
+
+
+def init_schema_check(app):
+    """
+    Verify the schema version on the first requests instead of at boot, so
+    create_app does not need a live Mongo. Until `flask db init/migrate`
+    has recorded SCHEMA_VERSION with this process's QUIZ_VALIDATOR,
+    requests are refused with 503: serving them would let Mongo create
+    collections implicitly, without the capped invalidation bus,
+    validators or TTL/lease indexes, or leave quiz contents unchecked
+    (QUIZ_VALIDATOR="db" against a database migrated with "app").
+    """
+    from .. import mongo
+
+    @app.before_request
+    def _check_schema():
+        if _checked is not None:
+            return
+        try:
+            ok, version = check_schema_version(mongo.db, app.config.get("QUIZ_VALIDATOR"))
+        except Exception as e:
+            # Mongo unreachable: retried on the next request
+            logger.warning("Schema version check failed: %s", e)
+            return
+        if not ok:
+            return jsonify({"error": "Database schema is not up to date"}), 503, {"Retry-After": "30"}
@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from pymongo import ReturnDocument
+from .. import mongo
+
+VERIFY_EMAIL = "verify_email"
+RESET_PASSWORD = "reset_password"
+
+OTP_TTL_SECONDS = 600
+MAX_ATTEMPTS = 5
+
+class OtpCode:
+    """
+    One-time codes in the otp_codes collection:
+        {email, purpose, code_hash, attempts, expires_at}
+    (email, purpose) is unique and a TTL index on expires_at lets Mongo
+    purge expired codes. Codes are stored as HMACs, never in clear.
+    """
+
+    @staticmethod
+    def _hash(email, purpose, code):
+        key = current_app.config["JWT_SECRET_KEY"].encode("utf-8")
+        msg = f"{purpose}:{email}:{code}".encode("utf-8")
+        return hmac.new(key, msg, hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def issue(email, purpose, ttl_seconds=OTP_TTL_SECONDS):
+        """
+        Create (or replace) the code for (email, purpose) and return it in clear.
+        """
+        code = f"{secrets.randbelow(900000) + 100000}"
+        now = datetime.now(timezone.utc)
+        mongo.db.otp_codes.replace_one(
+            {"email": email, "purpose": purpose},
+            {
+                "email": email,
+                "purpose": purpose,
+                "code_hash": OtpCode._hash(email, purpose, code),
+                "attempts": 0,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl_seconds)
+            },
+            upsert=True
+        )
+        return code
+
+    @staticmethod
+    def consume(email, purpose, code):
+        """
+        Check and burn a code in a single conditional delete.
+        On mismatch, the attempt counter is bumped so codes cannot be
+        brute-forced. Returns (ok, error_message).
+        """
+        now = datetime.now(timezone.utc)
+        deleted = mongo.db.otp_codes.find_one_and_delete({
+            "email": email,
+            "purpose": purpose,
+            "code_hash": OtpCode._hash(email, purpose, code),
+            "expires_at": {"$gt": now},
+            "attempts": {"$lt": MAX_ATTEMPTS}
+        }, projection={"_id": 1})
+        if deleted:
+            return True, None
+
+        failed = mongo.db.otp_codes.find_one_and_update(
+            {"email": email, "purpose": purpose, "expires_at": {"$gt": now}},
+            {"$inc": {"attempts": 1}},
+            projection={"attempts": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not failed:
+            return False, "OTP expired or not found. Please request a new one."
+        if failed["attempts"] > MAX_ATTEMPTS:
+            return False, "Too many attempts. Please request a new OTP."
+        return False, "Invalid OTP"
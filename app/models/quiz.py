@@ -1,6 +1,25 @@
+import json
+import os
 from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from .. import mongo
+from ..utils.cache import TTLCache
+from ..utils.read_routing import read_session
+from .repository import Repository
+
+COUNT_MODES = ("exact", "approx", "none")
+
+quizzes = Repository("quizzes")
+
+# Totals per normalized filter; cleared on every quiz write in this process,
+# the TTL bounds staleness from writes made by other workers.
+count_cache = TTLCache(ttl=int(os.getenv("QUIZ_COUNT_CACHE_TTL", 30)), maxsize=512)
+
+
+def _count_key(query):
+    return json.dumps(query, sort_keys=True, default=str)
 
 class Quiz:
     def __init__(
@@ -35,27 +54,101 @@ class Quiz:
         """
         Insert or update a quiz in MongoDB.
         If title already exists for the same teacher, update it.
+        Single round trip: the upsert returns the stored document.
         """
         data = self.__dict__.copy()
+        created_at = data.pop("created_at")
 
-        result = mongo.db.quizzes.update_one(
+        saved = quizzes.upsert(
             {"title": self.title, "teacher_id": self.teacher_id},
-            {"$set": data},
+            data,
+            on_insert={"created_at": created_at}
+        )
+        Quiz.mark_changed()
+        return saved
+
+    def upsert_op(self):
+        """
+        The UpdateOne that save() performs, for use in bulk_write.
+        """
+        data = self.__dict__.copy()
+        created_at = data.pop("created_at")
+        return UpdateOne(
+            {"title": self.title, "teacher_id": self.teacher_id},
+            {"$set": data, "$setOnInsert": {"created_at": created_at}},
             upsert=True
         )
 
-        if result.upserted_id:
-            data["_id"] = result.upserted_id
-        else:
-            existing = mongo.db.quizzes.find_one(
-                {"title": self.title, "teacher_id": self.teacher_id}
+    @staticmethod
+    def bulk_save(quizzes_to_save):
+        """
+        Upsert many quizzes keyed on (teacher_id, title) in one unordered
+        bulk_write. Returns (summary, errors) where errors maps the position
+        in quizzes_to_save to a message.
+        """
+        if not quizzes_to_save:
+            return {"inserted": 0, "updated": 0, "upserted_ids": {}}, {}
+
+        errors = {}
+        try:
+            result = mongo.db.quizzes.bulk_write(
+                [quiz.upsert_op() for quiz in quizzes_to_save], ordered=False
             )
-            if existing:
-                data["_id"] = existing["_id"]
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for write_error in details.get("writeErrors", []):
+                errors[write_error["index"]] = write_error.get("errmsg", "Write failed")
+
+        Quiz.mark_changed()
+        return {
+            "inserted": details.get("nUpserted", 0),
+            "updated": details.get("nModified", 0),
+            "upserted_ids": {u["index"]: u["_id"] for u in details.get("upserted", [])}
+        }, errors
+
+    @staticmethod
+    def mark_changed():
+        """
+        Called after every quiz write: drops cached totals and bumps the
+        collection version used for listing ETags.
+        """
+        count_cache.clear()
+        mongo.db.counters.update_one({"_id": "quizzes"}, {"$inc": {"version": 1}}, upsert=True)
+
+    @staticmethod
+    def list_version():
+        """
+        Collection-level version, bumped on every quiz write.
+        """
+        doc = quizzes.reads.database.counters.find_one({"_id": "quizzes"}, {"version": 1}, session=read_session())
+        return doc["version"] if doc else 0
 
-        return data
     @staticmethod
-    def find_paginated(skip=0, limit=10, query=None, projection=None, base_filter=None):
+    def count(query=None, mode="exact"):
+        """
+        Count quizzes matching query.
+        :param mode: "exact" - count_documents, served from count_cache
+                     "approx" - estimated_document_count when unfiltered,
+                                otherwise same as "exact"
+                     "none" - skip counting, returns None
+        """
+        if mode == "none":
+            return None
+
+        query = query or {}
+        if mode == "approx" and not query:
+            return quizzes.reads.estimated_document_count()
+
+        key = _count_key(query)
+        total = count_cache.get(key)
+        if total is None:
+            total = quizzes.reads.count_documents(query, session=read_session())
+            count_cache.set(key, total)
+        return total
+
+    @staticmethod
+    def find_paginated(skip=0, limit=10, query=None, projection=None, base_filter=None, count="exact", sort=None):
         """
         Fetch quizzes with pagination and return total count.
         :param skip: Number of docs to skip
@@ -63,7 +156,9 @@ class Quiz:
         :param query: Optional filter dict
         :param projection: Fields to include/exclude
         :param base_filter: Default WHERE clause (applied in all cases)
-        :return: dict with quizzes list and total count
+        :param count: Count mode, see Quiz.count
+        :param sort: Optional list of (field, direction) pairs
+        :return: dict with quizzes list and total count (None if count="none")
         """
         # base filter always applies
         if base_filter is None:
@@ -75,25 +170,74 @@ class Quiz:
 
         final_query = {**base_filter, **query}
 
-        total = mongo.db.quizzes.count_documents(final_query)
+        total = Quiz.count(final_query, count)
 
-        cursor = (
-            mongo.db.quizzes
-            .find(final_query, projection)
-            .skip(skip)
-            .limit(limit)
-        )
+        cursor = quizzes.reads.find(final_query, projection, session=read_session())
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.skip(skip).limit(limit)
 
         return {
             "items": list(cursor),
             "total": total
         }
-    
+
+    @staticmethod
+    def find_after(after=None, limit=10, query=None, projection=None, base_filter=None, direction=DESCENDING):
+        """
+        Fetch quizzes with keyset pagination on (created_at, _id).
+        :param after: Optional (created_at, _id) of the last doc of the previous page
+        :param limit: Max docs to return
+        :param query: Optional filter dict
+        :param projection: Fields to include/exclude
+        :param base_filter: Default WHERE clause (applied in all cases)
+        :param direction: DESCENDING (newest first) or ASCENDING
+        :return: dict with quizzes list and has_more flag
+        """
+        final_query = {**(base_filter or {}), **(query or {})}
+        return quizzes.find_after(final_query, projection, after, limit, direction)
+
     @staticmethod
-    def find_by_id(quiz_id):
+    def find_by_id(quiz_id, projection=None):
         if not ObjectId.is_valid(quiz_id):
             return None
-        return mongo.db.quizzes.find_one({"_id": ObjectId(quiz_id)})
+        return quizzes.reads.find_one({"_id": ObjectId(quiz_id)}, projection, session=read_session())
+
+    @staticmethod
+    def find_updated_at(quiz_id):
+        """
+        Fetch only _id, updated_at and teacher_id, for conditional GETs.
+        """
+        if not ObjectId.is_valid(quiz_id):
+            return None
+        return quizzes.reads.find_one(
+            {"_id": ObjectId(quiz_id)}, {"updated_at": 1, "teacher_id": 1}, session=read_session()
+        )
+
+    @staticmethod
+    def find_grading_meta(quiz_id):
+        """
+        Fetch only the fields needed to decide whether a quiz accepts
+        attempts, who owns it and which answer key version applies.
+        """
+        if not ObjectId.is_valid(quiz_id):
+            return None
+        return mongo.db.quizzes.find_one(
+            {"_id": ObjectId(quiz_id)},
+            {"quiz_type": 1, "start_time": 1, "duration_minutes": 1, "updated_at": 1, "teacher_id": 1}
+        )
+
+    @staticmethod
+    def find_answer_key(quiz_id):
+        """
+        Fetch question texts and correct answers only (no options).
+        """
+        if not ObjectId.is_valid(quiz_id):
+            return None
+        return mongo.db.quizzes.find_one(
+            {"_id": ObjectId(quiz_id)},
+            {"questions.text": 1, "questions.correct_answer": 1, "updated_at": 1}
+        )
 
     @staticmethod
     def find_all():
@@ -102,20 +246,13 @@ class Quiz:
     @staticmethod
     def update_quiz(quiz_id, updates: dict):
         try:
-            if not ObjectId.is_valid(quiz_id):
-                return None, "Invalid quiz ID"
-
-            updates["updated_at"] = datetime.now(timezone.utc)
-
-            result = mongo.db.quizzes.update_one(
-                {"_id": ObjectId(quiz_id)},
-                {"$set": updates}
+            updated_quiz, error = quizzes.update_by_id(
+                quiz_id, updates, invalid="Invalid quiz ID", not_found="Quiz not found"
             )
+            if error:
+                return None, error
 
-            if result.matched_count == 0:
-                return None, "Quiz not found"
-
-            updated_quiz = mongo.db.quizzes.find_one({"_id": ObjectId(quiz_id)})
+            Quiz.mark_changed()
             return updated_quiz, None
 
         except Exception as e:
@@ -129,4 +266,5 @@ class Quiz:
         result = mongo.db.quizzes.delete_one({"_id": ObjectId(quiz_id)})
         if result.deleted_count == 0:
             return False, "Quiz not found"
+        Quiz.mark_changed()
         return True, None
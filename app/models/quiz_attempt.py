@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+from .. import mongo
+
+class QuizAttempt:
+    def __init__(
+        self,
+        quiz_id,
+        student_id,
+        answers,
+        score,
+        submitted_at=None
+    ):
+        self.quiz_id = ObjectId(quiz_id)
+        self.student_id = ObjectId(student_id)
+        self.answers = answers          # Array of {question_text, selected_option, is_correct}
+        self.score = score              # int, number of correct answers
+        self.submitted_at = submitted_at or datetime.now(timezone.utc)
+
+    def save(self):
+        """
+        Insert the attempt in MongoDB.
+        """
+        data = self.__dict__.copy()
+        result = mongo.db.quiz_attempts.insert_one(data)
+        data["_id"] = result.inserted_id
+        return data
@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo import UpdateOne, ReplaceOne
+from .. import mongo
+
+class QuizStats:
+    """
+    Per-quiz attempt statistics, one document per quiz keyed by quiz _id:
+        {_id, attempts, score_sum, histogram: {"<score>": count}, updated_at}
+    Maintained with $inc on every graded attempt.
+    """
+
+    @staticmethod
+    def _inc_update(quiz_id, attempts, score_sum, histogram):
+        """
+        Build the (filter, update) pair adding attempts to a quiz's stats.
+        """
+        inc = {"attempts": attempts, "score_sum": score_sum}
+        for score, count in histogram.items():
+            inc[f"histogram.{score}"] = count
+        return (
+            {"_id": ObjectId(quiz_id)},
+            {"$inc": inc, "$set": {"updated_at": datetime.now(timezone.utc)}}
+        )
+
+    @staticmethod
+    def record(quiz_id, score):
+        """
+        Atomically add one graded attempt to a quiz's stats.
+        """
+        query, update = QuizStats._inc_update(quiz_id, 1, score, {score: 1})
+        mongo.db.quiz_stats.update_one(query, update, upsert=True)
+
+    @staticmethod
+    def record_many(scores_by_quiz: dict):
+        """
+        Add several graded attempts at once.
+        :param scores_by_quiz: {quiz_id: [score, ...]}
+        """
+        ops = []
+        for quiz_id, scores in scores_by_quiz.items():
+            histogram = {}
+            for score in scores:
+                histogram[score] = histogram.get(score, 0) + 1
+            query, update = QuizStats._inc_update(quiz_id, len(scores), sum(scores), histogram)
+            ops.append(UpdateOne(query, update, upsert=True))
+        if ops:
+            mongo.db.quiz_stats.bulk_write(ops, ordered=False)
+
+    @staticmethod
+    def find_by_quiz(quiz_id):
+        if not ObjectId.is_valid(quiz_id):
+            return None
+        return mongo.db.quiz_stats.find_one({"_id": ObjectId(quiz_id)})
+
+    @staticmethod
+    def rebuild(quiz_id=None, batch_size=500):
+        """
+        Recompute stats from quiz_attempts, for one quiz or all of them.
+        Scores are grouped server-side, and results are written back in
+        batches of ReplaceOne. Returns the number of quizzes rebuilt.
+        """
+        match = {"quiz_id": ObjectId(quiz_id)} if quiz_id else {}
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": {"quiz_id": "$quiz_id", "score": "$score"}, "count": {"$sum": 1}}},
+            {"$sort": {"_id.quiz_id": 1}},
+        ]
+        rows = mongo.db.quiz_attempts.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+
+        ops = []
+        rebuilt = 0
+        current, doc = None, None
+
+        def finish(doc):
+            return ReplaceOne({"_id": doc["_id"]}, doc, upsert=True)
+
+        for row in rows:
+            qid = row["_id"]["quiz_id"]
+            if qid != current:
+                if doc is not None:
+                    ops.append(finish(doc))
+                    rebuilt += 1
+                current = qid
+                doc = {"_id": qid, "attempts": 0, "score_sum": 0, "histogram": {},
+                       "updated_at": datetime.now(timezone.utc)}
+            score, count = row["_id"]["score"], row["count"]
+            doc["attempts"] += count
+            doc["score_sum"] += score * count
+            doc["histogram"][str(score)] = count
+
+            if len(ops) >= batch_size:
+                mongo.db.quiz_stats.bulk_write(ops, ordered=False)
+                ops = []
+
+        if doc is not None:
+            ops.append(finish(doc))
+            rebuilt += 1
+        if ops:
+            mongo.db.quiz_stats.bulk_write(ops, ordered=False)
+
+        if quiz_id and not rebuilt:
+            mongo.db.quiz_stats.delete_one({"_id": ObjectId(quiz_id)})
+        return rebuilt
+
+    @staticmethod
+    def summarize(doc):
+        """
+        Derive mean and median from a stats document. The histogram holds
+        one bin per integer score, so this is bounded by question count.
+        """
+        attempts = doc.get("attempts", 0)
+        histogram = {int(score): count for score, count in doc.get("histogram", {}).items() if count}
+        mean = doc.get("score_sum", 0) / attempts if attempts else None
+
+        median = None
+        if attempts:
+            # average of the lower and upper middle values
+            lower_rank, upper_rank = (attempts + 1) // 2, attempts // 2 + 1
+            seen, lower = 0, None
+            for score in sorted(histogram):
+                seen += histogram[score]
+                if lower is None and seen >= lower_rank:
+                    lower = score
+                if seen >= upper_rank:
+                    median = (lower + score) / 2
+                    break
+
+        return {
+            "quiz_id": str(doc["_id"]),
+            "attempts": attempts,
+            "mean": mean,
+            "median": median,
+            "histogram": {str(score): histogram[score] for score in sorted(histogram)}
+        }
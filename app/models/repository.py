@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo import ReturnDocument, DESCENDING
+from .. import mongo
+from ..utils.cursor import keyset_query
+from ..utils.read_routing import read_db, read_session
+
+class Repository:
+    """
+    Thin write helpers shared by the models. Every write is a single
+    find_one_and_update that returns the post-image, so callers never
+    need a follow-up find_one.
+    """
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return mongo.db[self.collection_name]
+
+    @property
+    def reads(self):
+        """
+        Collection for routed reads (see read_routing.causal_reads).
+        """
+        return read_db()[self.collection_name]
+
+    def upsert(self, query, fields: dict, on_insert=None, projection=None):
+        """
+        Set fields on the document matching query, inserting it if missing.
+        on_insert fields are only written when the document is created.
+        Returns the document after the write.
+        """
+        update = {"$set": fields}
+        if on_insert:
+            update["$setOnInsert"] = on_insert
+        return self.collection.find_one_and_update(
+            query,
+            update,
+            projection=projection,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    def update_by_id(self, doc_id, updates: dict, projection=None,
+                     invalid="Invalid ID", not_found="Document not found"):
+        """
+        $set updates (plus updated_at) on the document with _id doc_id.
+        Returns (updated_doc, error_message).
+        """
+        if not ObjectId.is_valid(doc_id):
+            return None, invalid
+
+        # never try to rewrite the immutable _id
+        fields = {k: v for k, v in updates.items() if k != "_id"}
+        fields["updated_at"] = datetime.now(timezone.utc)
+
+        doc = self.collection.find_one_and_update(
+            {"_id": ObjectId(doc_id)},
+            {"$set": fields},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            return None, not_found
+        return doc, None
+
+    def find_after(self, query, projection=None, after=None, limit=10, direction=DESCENDING):
+        """
+        Keyset page on (created_at, _id): documents strictly after `after`
+        ((created_at, _id) of the previous page's last doc, or None).
+        Returns {"items": [...], "has_more": bool}.
+        """
+        query = keyset_query(query, after, direction)
+
+        # Fetch one extra doc to know whether another page exists
+        cursor = (
+            self.reads
+            .find(query, projection, session=read_session())
+            .sort([("created_at", direction), ("_id", direction)])
+            .limit(limit + 1)
+        )
+        items = list(cursor)
+
+        return {
+            "items": items[:limit],
+            "has_more": len(items) > limit
+        }
@@ -1,5 +1,44 @@
+import os
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
 from .. import mongo
+from ..utils.cache import TTLCache
+from .repository import Repository
+from ..utils import invalidation
+
+# Fields role_guard needs; never includes the password hash or OTPs.
+PRINCIPAL_PROJECTION = {
+    "_id": 1,
+    "email": 1,
+    "roles": 1,
+    "is_active": 1,
+    "verified_email": 1,
+    "class_level": 1
+}
+PRINCIPAL_CHANNEL = "principal"
+
+# Fields never sent back to clients
+PRIVATE_PROJECTION = {"password": 0, "otp": 0, "otp_created_at": 0}
+
+# Fields returned by user listings
+PUBLIC_PROJECTION = {
+    "_id": 1,
+    "email": 1,
+    "roles": 1,
+    "class_level": 1,
+    "school_institution": 1,
+    "is_active": 1,
+    "verified_email": 1,
+    "created_at": 1
+}
+
+users = Repository("users")
+
+principal_cache = TTLCache(
+    ttl=int(os.getenv("PRINCIPAL_CACHE_TTL", 60)),
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+)
+invalidation.subscribe(PRINCIPAL_CHANNEL, principal_cache.delete)
 
 class User:
     def __init__(
@@ -40,7 +79,8 @@ class User:
 
     def save(self):
         data = self.__dict__
-        mongo.db.users.update_one({"email": self.email}, {"$set": data}, upsert=True)
+        users.upsert({"email": self.email}, data, projection={"_id": 1})
+        User.invalidate_principal(self.email)
         return data
 
     @staticmethod
@@ -48,33 +88,105 @@ class User:
         return mongo.db.users.find_one({"email": email})
 
     @staticmethod
-    def update_user(user_id, updates: dict):
+    def find_after(after=None, limit=50, query=None):
+        """
+        Keyset page of users on (created_at desc, _id desc), public fields only.
+        """
+        return users.find_after(query or {}, PUBLIC_PROJECTION, after, limit)
+
+    @staticmethod
+    def iter_all(query=None, batch_size=1000):
+        """
+        Cursor over all matching users (public fields only), newest first.
+        """
+        return (
+            mongo.db.users
+            .find(query or {}, PUBLIC_PROJECTION)
+            .sort([("created_at", -1), ("_id", -1)])
+            .batch_size(batch_size)
+        )
+
+    @staticmethod
+    def find_principal(email):
+        """
+        Slim auth view of a user (PRINCIPAL_PROJECTION), served from
+        principal_cache. Returns None if the user does not exist.
+        """
+        principal = principal_cache.get(email)
+        if principal is None:
+            principal = mongo.db.users.find_one({"email": email}, PRINCIPAL_PROJECTION)
+            if principal is not None:
+                principal_cache.set(email, principal)
+        return principal
+
+    @staticmethod
+    def is_student(user_id):
+        """
+        True if user_id (an ObjectId) belongs to an existing student.
+        """
+        return mongo.db.users.find_one({"_id": user_id, "roles": "student"}, {"_id": 1}) is not None
+
+    @staticmethod
+    def invalidate_principal(email):
+        """
+        Drop a cached principal in this worker and broadcast to the others.
+        """
+        invalidation.publish(PRINCIPAL_CHANNEL, email)
+
+    @staticmethod
+    def update_user(user_id, updates: dict, projection=None):
         """
         Update a user document by ID.
         Args:
             user_id (str | ObjectId): The user's MongoDB _id.
             updates (dict): Fields to update.
+            projection (dict, optional): Fields of the updated user to return.
         Returns:
             (dict, str): (updated_user, error_message)
         """
-        from bson import ObjectId
+        # email is needed to invalidate the cached principal
+        if projection and any(projection.values()):
+            projection = {**projection, "email": 1}
 
         try:
-            if not ObjectId.is_valid(user_id):
-                return None, "Invalid user ID"
-
-            updates["updated_at"] = datetime.now(timezone.utc)
-
-            result = mongo.db.users.update_one(
-                {"_id": ObjectId(user_id)},
-                {"$set": updates}
+            updated_user, error = users.update_by_id(
+                user_id, updates, projection=projection,
+                invalid="Invalid user ID", not_found="User not found"
             )
+            if error:
+                return None, error
 
-            if result.matched_count == 0:
-                return None, "User not found"
-
-            updated_user = mongo.db.users.find_one({"_id": ObjectId(user_id)})
+            User.invalidate_principal(updated_user["email"])
             return updated_user, None
 
         except Exception as e:
             return None, str(e)
+
+    @staticmethod
+    def mark_verified(email):
+        """
+        Flag the user's email as verified in a single conditional update.
+        Returns the updated user without private fields, or None.
+        """
+        now = datetime.now(timezone.utc)
+        user = mongo.db.users.find_one_and_update(
+            {"email": email},
+            {"$set": {"verified_email": True, "updated_at": now},
+             "$unset": {"otp": "", "otp_created_at": ""}},
+            projection=PRIVATE_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if user:
+            User.invalidate_principal(email)
+        return user
+
+    @staticmethod
+    def set_password(email, password_hash):
+        """
+        Replace the user's password hash. Returns True if the user exists.
+        """
+        result = mongo.db.users.update_one(
+            {"email": email},
+            {"$set": {"password": password_hash, "updated_at": datetime.now(timezone.utc)}}
+        )
+        return result.matched_count > 0
@@ -1,11 +1,37 @@
-from flask import Blueprint, request, jsonify
-from ..schemas.quiz_schema import QuizSchema
-from ..services.quiz_service import QuizService
+from bson import ObjectId
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from marshmallow import ValidationError
+from ..schemas.quiz_schema import QuizSchema, ShallowQuizSchema, QuizListQuerySchema, QuizAttemptSchema
+from ..services.quiz_service import QuizService, LIST_FILTER_FIELDS
+from ..services.attempt_service import AttemptService
+from ..services.attempt_ingest import ingest_attempts
+from ..services.export_service import ExportService, EXPORT_FORMATS, MIMETYPES
+from ..models.quiz import Quiz
+from ..models.user import User
 from ..utils.user_guard import role_guard
+from ..utils.read_routing import causal_reads
+from ..utils.conditional import make_etag, is_not_modified, not_modified, with_validators
 
 quiz_bp = Blueprint("quiz", __name__)
 quiz_schema = QuizSchema()
-quiz_list_schema = QuizSchema(many=True)
+quiz_bulk_schema = QuizSchema(many=True)
+shallow_quiz_schema = ShallowQuizSchema()
+shallow_quiz_bulk_schema = ShallowQuizSchema(many=True)
+
+MAX_BULK_QUIZZES = 1000
+list_query_schema = QuizListQuerySchema()
+attempt_schema = QuizAttemptSchema()
+
+
+def _quiz_schema(many=False):
+    """
+    Full app-side validation, or shape-only when QUIZ_VALIDATOR="db"
+    leaves question contents to Mongo's $jsonSchema.
+    """
+    if current_app.config.get("QUIZ_VALIDATOR") == "db":
+        return shallow_quiz_bulk_schema if many else shallow_quiz_schema
+    return quiz_bulk_schema if many else quiz_schema
 
 
 @quiz_bp.route("/quizzes", methods=["POST"])
@@ -14,50 +40,298 @@ def create_quiz():
     """
     Create a new quiz (teacher only).
     Supports both 'anytime' and 'scheduled' quizzes.
+    teacher_id is forced to the caller.
     """
     json_data = request.get_json()
 
-    # Validate schema
-    errors = quiz_schema.validate(json_data)
-    if errors:
-        return jsonify({"errors": errors}), 400
+    # Validate and deserialize in one pass
+    try:
+        data = _quiz_schema().load(json_data)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
 
-    quiz, error = QuizService.create_quiz(json_data)
+    data["teacher_id"] = str(User.find_principal(get_jwt_identity())["_id"])
+
+    quiz, error = QuizService.create_quiz(data)
     if error:
         return jsonify({"error": error}), 400
 
 
-    return jsonify(quiz_schema.dump(quiz)), 201
+    return jsonify(quiz), 201
+
+
+@quiz_bp.route("/quizzes/bulk", methods=["POST"])
+@role_guard(["teacher"])
+def bulk_create_quizzes():
+    """
+    Create or update many quizzes at once (teacher only).
+    Body: a JSON array of quiz payloads (same shape as POST /quizzes).
+    Valid items are upserted on (teacher_id, title) in one bulk write;
+    invalid ones are reported by index. teacher_id is forced to the
+    caller, so only the caller's own quizzes can be overwritten.
+    """
+    json_data = request.get_json()
+    if not isinstance(json_data, list) or not json_data:
+        return jsonify({"error": "Body must be a non-empty array of quizzes"}), 400
+    if len(json_data) > MAX_BULK_QUIZZES:
+        return jsonify({"error": f"At most {MAX_BULK_QUIZZES} quizzes per request"}), 400
+
+    try:
+        items, errors = _quiz_schema(many=True).load(json_data), {}
+    except ValidationError as err:
+        items, errors = err.valid_data, err.messages
+
+    teacher_id = str(User.find_principal(get_jwt_identity())["_id"])
+    for item in items:
+        if isinstance(item, dict):
+            item["teacher_id"] = teacher_id
+    result = QuizService.bulk_create_quizzes(items, errors)
+
+    status = 200 if result["inserted"] or result["updated"] or not result["failed"] else 400
+    return jsonify(result), status
+
+
+def _viewer():
+    """
+    Principal of the caller when a valid token was sent, else None.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return None  # bad or missing token: anonymous
+    return User.find_principal(identity) if identity is not None else None
+
+
+def _quiz_etag(quiz, with_answers):
+    # the owner/admin representation (with correct_answer) gets its own ETag
+    if with_answers:
+        return make_etag(quiz["_id"], quiz.get("updated_at"), "answers")
+    return make_etag(quiz["_id"], quiz.get("updated_at"))
 
 
 @quiz_bp.route("/quizzes/<quiz_id>", methods=["GET"])
+@causal_reads
 def get_quiz(quiz_id):
     """
     Get a quiz by ID.
+    correct_answer is only included for the quiz owner or an admin.
+    Supports conditional GET: the ETag is derived from _id + updated_at,
+    and If-None-Match is answered from a projected updated_at lookup.
+    """
+    viewer = _viewer()
+    if request.if_none_match or request.if_modified_since:
+        version = Quiz.find_updated_at(quiz_id)
+        if version:
+            etag = _quiz_etag(version, QuizService.can_see_answers(version, viewer))
+            if is_not_modified(etag, version.get("updated_at")):
+                response = not_modified(etag, version.get("updated_at"))
+                response.vary.add("Authorization")
+                return response
+
+    quiz, error = QuizService.get_quiz_by_id(quiz_id, viewer)
+    if error:
+        return jsonify({"error": error}), 404
+
+    etag = _quiz_etag(quiz, QuizService.can_see_answers(quiz, viewer))
+    response = with_validators(jsonify(quiz), etag, quiz.get("updated_at"))
+    response.vary.add("Authorization")
+    return response, 200
+
+
+@quiz_bp.route("/quizzes/<quiz_id>/attempts", methods=["POST"])
+@role_guard(["student"])
+def submit_attempt(quiz_id):
     """
-    quiz, error = QuizService.get_quiz_by_id(quiz_id)
+    Submit and grade an attempt (student only).
+    Body: {"answers": [{"question_text": str, "selected_option": str}]}
+    Scheduled quizzes only accept attempts between start_time and
+    start_time + duration_minutes.
+    """
+    try:
+        data = attempt_schema.load(request.get_json())
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    user = User.find_principal(get_jwt_identity())
+    result, error = AttemptService.submit_attempt(quiz_id, user["_id"], data["answers"])
+    if error:
+        status = 404 if error == "Quiz not found" else 400
+        return jsonify({"error": error}), status
+
+    return jsonify(result), 201
+
+
+@quiz_bp.route("/quizzes/<quiz_id>/stats", methods=["GET"])
+@role_guard(["teacher", "admin"])
+def get_quiz_stats(quiz_id):
+    """
+    Attempt count, mean/median score and score histogram for a quiz.
+    Teachers only get stats for their own quizzes.
+    """
+    user = User.find_principal(get_jwt_identity())
+    quiz = Quiz.find_by_id(quiz_id, {"teacher_id": 1})
+    if not quiz:
+        return jsonify({"error": "Quiz not found"}), 404
+    if "admin" not in user.get("roles", []) and quiz.get("teacher_id") != user["_id"]:
+        return jsonify({"msg": "Access denied: not your quiz"}), 403
+
+    stats, error = AttemptService.get_stats(quiz_id)
     if error:
         return jsonify({"error": error}), 404
 
-    return quiz_schema.jsonify(quiz), 200
+    return jsonify(stats), 200
+
+
+@quiz_bp.route("/attempts/bulk", methods=["POST"])
+@role_guard(["teacher", "admin"])
+def bulk_import_attempts():
+    """
+    Import offline attempts as NDJSON (one attempt per line):
+        {"quiz_id": str, "student_id": str, "answers": [...], "submitted_at": iso8601?}
+    The body is streamed and graded line by line; the response reports
+    inserted/failed counts and per-line errors. Teachers can only import
+    into their own quizzes, and every student_id must be an existing student.
+    """
+    report = ingest_attempts(request.stream, caller=User.find_principal(get_jwt_identity()))
+    return jsonify(report), 200
+
+
+def _export_response(chunks, fmt, name):
+    return Response(
+        stream_with_context(chunks),
+        mimetype=MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={name}.{fmt}"}
+    )
+
+
+@quiz_bp.route("/export/quizzes", methods=["GET"])
+@role_guard(["teacher", "admin"])
+def export_quizzes():
+    """
+    Stream quizzes as NDJSON (full documents) or CSV (one row per quiz).
+    Query Params:
+        format (str) - ndjson (default) or csv
+    Teachers only get their own quizzes.
+    """
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be one of: ndjson, csv"}), 400
+
+    user = User.find_principal(get_jwt_identity())
+    query = {} if "admin" in user.get("roles", []) else {"teacher_id": user["_id"]}
+
+    return _export_response(ExportService.export_quizzes(fmt, query), fmt, "quizzes")
+
+
+@quiz_bp.route("/export/attempts", methods=["GET"])
+@role_guard(["teacher", "admin"])
+def export_attempts():
+    """
+    Stream quiz attempts as NDJSON or CSV.
+    Query Params:
+        format (str) - ndjson (default) or csv
+        quiz_id (str) - required for teachers, who must own the quiz
+    """
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be one of: ndjson, csv"}), 400
+
+    user = User.find_principal(get_jwt_identity())
+    quiz_id = request.args.get("quiz_id")
+    is_admin = "admin" in user.get("roles", [])
+
+    query = {}
+    if quiz_id:
+        quiz = Quiz.find_by_id(quiz_id, {"teacher_id": 1})
+        if not quiz:
+            return jsonify({"error": "Quiz not found"}), 404
+        if not is_admin and quiz.get("teacher_id") != user["_id"]:
+            return jsonify({"msg": "Access denied: not your quiz"}), 403
+        query["quiz_id"] = ObjectId(quiz_id)
+    elif not is_admin:
+        return jsonify({"error": "quiz_id is required"}), 400
+
+    return _export_response(ExportService.export_attempts(fmt, query), fmt, "attempts")
 
 
 @quiz_bp.route("/quizzes", methods=["GET"])
+@causal_reads
 def get_quizzes():
     """
     Get all quizzes with pagination.
     Query Params:
         page (int) - page number, default=1
-        limit (int) - items per page, default=10
+        limit (int) - items per page, default=10, max=100
+        cursor (str, optional) - switch to keyset pagination; pass an empty
+            value for the first page, then the returned next_cursor
+        count (str, optional) - how to compute total: exact (default), approx, none
+        sort (str, optional) - -created_at (default) or created_at
+        teacher_id (str, optional) - filter by teacher
         class_level (str, optional) - filter by class level
+        Subject (str, optional) - filter by subject
+        status (str, optional) - filter by difficulty (easy/medium/hard)
         quiz_type (str, optional) - filter by quiz type (anytime/scheduled)
+    Only filter combinations backed by an index are accepted, see
+    QuizService.build_list_query.
+    """
+    try:
+        params = list_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    return _list_quizzes(params)
+
+
+@quiz_bp.route("/quizzes/mine", methods=["GET"])
+@role_guard(["teacher"])
+@causal_reads
+def get_my_quizzes():
+    """
+    List the calling teacher's quizzes, newest first.
+    Query Params:
+        page, limit, cursor, count, sort - as for GET /quizzes
+    Only the teacher_created index backs this listing, so the other
+    GET /quizzes filters (class_level, Subject, status, quiz_type) are
+    rejected; teacher_id is forced to the caller.
     """
-    page = int(request.args.get("page", 1))
-    limit = int(request.args.get("limit", 10))
+    try:
+        params = list_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    filters = sorted(
+        field for field in LIST_FILTER_FIELDS if field != "teacher_id" and params.get(field) is not None
+    )
+    if filters:
+        return jsonify({"error": "Filters are not supported on /quizzes/mine: " + ", ".join(filters)}), 400
+
+    user = User.find_principal(get_jwt_identity())
+    params["teacher_id"] = str(user["_id"])
+
+    return _list_quizzes(params)
+
+
+def _list_quizzes(params):
+    query, direction, error = QuizService.build_list_query(params)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Any quiz write bumps the collection version, invalidating every page
+    version = Quiz.list_version()
+    etag = make_etag(version, sorted(params.items()))
+    if is_not_modified(etag):
+        return not_modified(etag)
 
-    result = QuizService.get_all_quizzes(page=page, limit=limit)
+    if "cursor" in params:
+        result, error = QuizService.get_quizzes_after(
+            cursor=params["cursor"], limit=params["limit"], query=query, direction=direction
+        )
+        if error:
+            return jsonify({"error": error}), 400
+    else:
+        result = QuizService.get_all_quizzes(
+            page=params["page"], limit=params["limit"], count=params["count"], query=query, direction=direction
+        )
 
-    return jsonify({
-        **result,
-        "quizzes": quiz_list_schema.dump(result["quizzes"])
-    }), 200
\ No newline at end of file
+    return with_validators(jsonify(result), etag), 200
@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from .. import mongo
 from ..schemas import auth_schema  # only if using Marshmallow
+from ..utils import metrics
 
 main = Blueprint("main", __name__)
 
@@ -9,3 +10,10 @@ def create_user():
  
     return jsonify({"msg": "User created"}), 201
 
+
+@main.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Prometheus text exposition of this worker's request and Mongo metrics.
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
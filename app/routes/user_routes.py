@@ -1,8 +1,16 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timezone
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from marshmallow import ValidationError
 from .. import mongo
 from ..schemas import auth_schema  # only if using Marshmallow
+from ..schemas.auth_schema import UserListQuerySchema
+from ..models.user import User
+from ..services.user_service import UserService
+from ..services.export_service import ndjson_chunks
+from ..utils.user_guard import role_guard
 
 users = Blueprint("users", __name__)
+list_query_schema = UserListQuerySchema()
 
 @users.route("/users", methods=["POST"])
 def create_user():
@@ -12,10 +20,40 @@ def create_user():
     if errors:
         return jsonify(errors), 400
 
+    # the users listing pages on created_at
+    now = datetime.now(timezone.utc)
+    data.setdefault("created_at", now)
+    data.setdefault("updated_at", now)
     mongo.db.users.insert_one(data)
     return jsonify({"msg": "User created"}), 201
 
 @users.route("/users", methods=["GET"])
+@role_guard(["admin"])
 def get_users():
-    users_list = list(mongo.db.users.find({}, {"_id": 0}))
-    return jsonify(users_list), 200
+    """
+    List users (admin only), public fields only.
+    Query Params:
+        limit (int) - page size, default=50, max=500
+        cursor (str, optional) - next_cursor from the previous page
+        role (str, optional) - filter by role
+        class_level (str, optional) - filter by class level
+        stream (bool, optional) - stream every matching user as NDJSON instead
+    """
+    try:
+        params = list_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    query = UserService.build_list_query(params)
+
+    if params["stream"]:
+        return Response(
+            stream_with_context(ndjson_chunks(User.iter_all(query))),
+            mimetype="application/x-ndjson"
+        )
+
+    result, error = UserService.list_users(query, cursor=params["cursor"], limit=params["limit"])
+    if error:
+        return jsonify({"error": error}), 400
+
+    return jsonify(result), 200
@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, fields, validate, EXCLUDE
 
 
 class UserRegisterSchema(Schema):
@@ -57,4 +57,28 @@ class ForgotPasswordSchema(Schema):
 class ResetPasswordSchema(Schema):
     email = fields.Email(required=True)
     otp = fields.String(required=True, validate=lambda x: len(x) == 6)
-    new_password = fields.Str(required=True, validate=lambda x: len(x) >= 6)
\ No newline at end of file
+    new_password = fields.Str(required=True, validate=lambda x: len(x) >= 6)
+
+
+class UserListQuerySchema(Schema):
+    """
+    Query params accepted by GET /users/users.
+    """
+    class Meta:
+        unknown = EXCLUDE
+
+    limit = fields.Integer(
+        load_default=50,
+        validate=validate.Range(min=1, max=500, error="limit must be between 1 and 500.")
+    )
+    cursor = fields.String(load_default=None)
+    role = fields.String(
+        validate=validate.OneOf(["admin", "teacher", "student"], error="Role must be one of: admin, teacher, student.")
+    )
+    class_level = fields.String(
+        validate=validate.OneOf(
+            ["O-level", "A-level", "SAT", "IB"],
+            error="Class level must be one of: O-level, A-level, SAT, IB."
+        )
+    )
+    stream = fields.Boolean(load_default=False)
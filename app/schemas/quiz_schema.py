@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError, EXCLUDE
 
 
 class QuestionSchema(Schema):
@@ -26,6 +26,92 @@ class QuestionSchema(Schema):
             raise ValidationError("Correct answer must be one of the options.", field_name="correct_answer")
 
 
+class QuestionListField(fields.Field):
+    """
+    Fast path for the questions list: hand-written checks equivalent to
+    fields.List(fields.Nested(QuestionSchema)), without building a schema
+    per question. Error messages and their {index: {field: [...]}} shape
+    match QuestionSchema.
+    With deep=False only the list/object shape is checked and the rest is
+    left to the quizzes $jsonSchema validator in Mongo. Question texts
+    must be unique in both modes.
+    """
+
+    QUESTION_FIELDS = ("text", "options", "correct_answer")
+
+    def __init__(self, deep=True, **kwargs):
+        super().__init__(**kwargs)
+        self.deep = deep
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return value
+
+    def _check_question(self, question):
+        errors = {}
+        for key in question:
+            if key not in self.QUESTION_FIELDS:
+                errors[key] = ["Unknown field."]
+
+        text = question.get("text")
+        if text is None:
+            errors["text"] = ["Question text is required."]
+        elif not isinstance(text, str):
+            errors["text"] = ["Not a valid string."]
+
+        options = question.get("options")
+        if options is None:
+            errors["options"] = ["Options are required."]
+        elif not isinstance(options, list):
+            errors["options"] = ["Not a valid list."]
+        else:
+            bad = {i: ["Not a valid string."] for i, option in enumerate(options) if not isinstance(option, str)}
+            if bad:
+                errors["options"] = bad
+            elif len(options) < 2:
+                errors["options"] = ["At least 2 options are required."]
+
+        correct_answer = question.get("correct_answer")
+        if correct_answer is None:
+            errors["correct_answer"] = ["Correct answer is required."]
+        elif not isinstance(correct_answer, str):
+            errors["correct_answer"] = ["Not a valid string."]
+        elif "options" not in errors and correct_answer not in options:
+            errors["correct_answer"] = ["Correct answer must be one of the options."]
+
+        return errors
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, list):
+            raise ValidationError("Not a valid list.")
+        if not value:
+            raise ValidationError("At least one question is required.")
+
+        errors = {}
+        questions = []
+        texts = set()
+        for index, question in enumerate(value):
+            if not isinstance(question, dict):
+                errors[index] = {"_schema": ["Invalid input type."]}
+                continue
+            if self.deep:
+                question_errors = self._check_question(question)
+                if question_errors:
+                    errors[index] = question_errors
+                    continue
+            # answers and the answer key refer to questions by text
+            text = question.get("text")
+            if isinstance(text, str):
+                if text in texts:
+                    errors[index] = {"text": ["Duplicate question text."]}
+                    continue
+                texts.add(text)
+            questions.append({key: question.get(key) for key in self.QUESTION_FIELDS})
+
+        if errors:
+            raise ValidationError(errors)
+        return questions
+
+
 class QuizSchema(Schema):
     teacher_id = fields.String(
         required=True,
@@ -85,12 +171,109 @@ class QuizSchema(Schema):
         error_messages={"required": "Duration is required."}
     )
 
-    questions = fields.List(
-        fields.Nested(QuestionSchema),
+    questions = QuestionListField(
         required=True,
-        validate=validate.Length(min=1, error="At least one question is required."),
         error_messages={"required": "Questions are required."}
     )
 
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
+
+
+class ShallowQuizSchema(QuizSchema):
+    """
+    QuizSchema for QUIZ_VALIDATOR="db": question contents are only
+    shape-checked here and fully validated by Mongo's $jsonSchema.
+    """
+    questions = QuestionListField(
+        deep=False,
+        required=True,
+        error_messages={"required": "Questions are required."}
+    )
+
+
+class QuizListQuerySchema(Schema):
+    """
+    Query params accepted by GET /quiz/quizzes.
+    """
+    class Meta:
+        unknown = EXCLUDE
+
+    page = fields.Integer(
+        load_default=1,
+        validate=validate.Range(min=1, error="page must be at least 1.")
+    )
+    limit = fields.Integer(
+        load_default=10,
+        validate=validate.Range(min=1, max=100, error="limit must be between 1 and 100.")
+    )
+    cursor = fields.String()
+    count = fields.String(
+        load_default="exact",
+        validate=validate.OneOf(["exact", "approx", "none"], error="count must be one of: exact, approx, none.")
+    )
+    sort = fields.String(
+        load_default="-created_at",
+        validate=validate.OneOf(["-created_at", "created_at"], error="sort must be one of: -created_at, created_at.")
+    )
+
+    teacher_id = fields.String()
+    class_level = fields.String(
+        validate=validate.OneOf(
+            ["O-level", "A-level", "SAT", "IB"],
+            error="Class level must be one of: O-level, A-level, SAT, IB."
+        )
+    )
+    Subject = fields.String(
+        validate=validate.OneOf(
+            ["Mathematics", "Biology", "Chemistry", "Physics", "English"],
+            error="Subject must be one of: Mathematics, Biology, Chemistry, Physics, English."
+        )
+    )
+    status = fields.String(
+        validate=validate.OneOf(
+            ["easy", "medium", "hard"],
+            error="status  must be one of: easy, medium, hard."
+        )
+    )
+    quiz_type = fields.String(
+        validate=validate.OneOf(
+            ["anytime", "scheduled"],
+            error="quiz type  must be one of: scheduled, anytime."
+        )
+    )
+
+
+class AttemptAnswerSchema(Schema):
+    question_text = fields.String(
+        required=True,
+        error_messages={"required": "Question text is required."}
+    )
+    selected_option = fields.String(
+        required=True,
+        error_messages={"required": "Selected option is required."}
+    )
+
+
+class QuizAttemptSchema(Schema):
+    answers = fields.List(
+        fields.Nested(AttemptAnswerSchema),
+        required=True,
+        validate=validate.Length(min=1, error="At least one answer is required."),
+        error_messages={"required": "Answers are required."}
+    )
+
+
+class BulkAttemptSchema(QuizAttemptSchema):
+    """
+    One NDJSON line of an offline attempts upload.
+    """
+    quiz_id = fields.String(
+        required=True,
+        error_messages={"required": "quiz id is required."}
+    )
+    student_id = fields.String(
+        required=True,
+        error_messages={"required": "student id is required."}
+    )
+    submitted_at = fields.DateTime(required=False)
@@ -0,0 +1,178 @@
+import json
+from datetime import datetime, timezone
+from bson import ObjectId
+from marshmallow import ValidationError
+from pymongo.errors import BulkWriteError
+from .. import mongo
+from ..models.quiz import Quiz
+from ..models.quiz_stats import QuizStats
+from ..models.user import User
+from ..schemas.quiz_schema import BulkAttemptSchema
+from ..utils.cache import TTLCache
+from .grading import get_answer_key, grade
+
+bulk_attempt_schema = BulkAttemptSchema()
+
+BATCH_SIZE = 500
+MAX_LINE_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+# Per-upload quiz and student lookups (LRU), so many distinct or made-up ids cannot grow memory
+LOOKUP_CACHE_SIZE = 1000
+LOOKUP_CACHE_TTL = 300
+
+_UNSEEN = object()
+
+
+def iter_lines(stream, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Yield (line_number, line) from a binary stream without ever holding
+    more than max_line_bytes. Over-long lines are drained and yielded as None.
+    """
+    lineno = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        lineno += 1
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            # drain the rest of the over-long line
+            while True:
+                rest = stream.readline(max_line_bytes)
+                if not rest or rest.endswith(b"\n"):
+                    break
+            yield lineno, None
+            continue
+        yield lineno, line
+
+
+class _Report:
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, lineno, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": lineno, "error": message})
+
+    def as_dict(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+def _parse_line(line, keys, students, caller=None):
+    """
+    Validate and grade one NDJSON line. Returns (doc, error).
+    keys caches (answer key, teacher_id) per quiz_id and students caches
+    student lookups for the upload, both size-capped TTLCaches. With a caller (the uploading principal),
+    non-admins may only import into their own quizzes.
+    """
+    try:
+        raw = json.loads(line)
+    except ValueError:
+        return None, "Invalid JSON"
+
+    try:
+        data = bulk_attempt_schema.load(raw)
+    except ValidationError as err:
+        return None, err.messages
+
+    quiz_id = data["quiz_id"]
+    if not ObjectId.is_valid(quiz_id) or not ObjectId.is_valid(data["student_id"]):
+        return None, "Invalid quiz_id or student_id"
+
+    entry = keys.get(quiz_id, _UNSEEN)
+    if entry is _UNSEEN:
+        meta = Quiz.find_grading_meta(quiz_id)
+        entry = (get_answer_key(quiz_id, meta.get("updated_at")), meta.get("teacher_id")) if meta else None
+        keys.set(quiz_id, entry)
+    if entry is None:
+        return None, "Quiz not found"
+    key, teacher_id = entry
+
+    if caller is not None and "admin" not in caller.get("roles", []) and teacher_id != caller["_id"]:
+        return None, "Access denied: not your quiz"
+
+    student_id = ObjectId(data["student_id"])
+    is_student = students.get(student_id)
+    if is_student is None:
+        is_student = User.is_student(student_id)
+        students.set(student_id, is_student)
+    if not is_student:
+        return None, "Student not found"
+
+    graded, score, error = grade(key, data["answers"])
+    if error:
+        return None, error
+
+    return {
+        "quiz_id": ObjectId(quiz_id),
+        "student_id": student_id,
+        "answers": graded,
+        "score": score,
+        "submitted_at": data.get("submitted_at") or datetime.now(timezone.utc)
+    }, None
+
+
+def _flush(batch, report):
+    if not batch:
+        return
+    line_numbers = [lineno for lineno, _ in batch]
+    docs = [doc for _, doc in batch]
+    failed = set()
+    try:
+        result = mongo.db.quiz_attempts.insert_many(docs, ordered=False)
+        report.inserted += len(result.inserted_ids)
+    except BulkWriteError as e:
+        details = e.details
+        report.inserted += details.get("nInserted", 0)
+        for write_error in details.get("writeErrors", []):
+            failed.add(write_error["index"])
+            report.error(line_numbers[write_error["index"]], write_error.get("errmsg", "Write failed"))
+
+    scores_by_quiz = {}
+    for index, doc in enumerate(docs):
+        if index not in failed:
+            scores_by_quiz.setdefault(doc["quiz_id"], []).append(doc["score"])
+    QuizStats.record_many(scores_by_quiz)
+    batch.clear()
+
+
+def ingest_attempts(stream, batch_size=BATCH_SIZE, max_errors=MAX_REPORTED_ERRORS, caller=None):
+    """
+    Stream NDJSON attempts from a binary stream, grade each line with the
+    live answer keys and write them in unordered insert_many batches.
+    caller is the uploading principal; None (the CLI) skips the ownership check.
+    Memory is bounded by batch_size, LOOKUP_CACHE_SIZE and max_errors,
+    regardless of the upload size.
+    Returns a summary dict with per-line errors.
+    """
+    report = _Report(max_errors)
+    keys = TTLCache(ttl=LOOKUP_CACHE_TTL, maxsize=LOOKUP_CACHE_SIZE)
+    students = TTLCache(ttl=LOOKUP_CACHE_TTL, maxsize=LOOKUP_CACHE_SIZE)
+    batch = []
+
+    for lineno, line in iter_lines(stream):
+        if line is None:
+            report.error(lineno, "Line too long")
+            continue
+        if not line.strip():
+            continue
+
+        doc, error = _parse_line(line, keys, students, caller)
+        if error:
+            report.error(lineno, error)
+            continue
+
+        batch.append((lineno, doc))
+        if len(batch) >= batch_size:
+            _flush(batch, report)
+
+    _flush(batch, report)
+    return report.as_dict()
@@ -0,0 +1,63 @@
+from ..models.quiz import Quiz
+from ..models.quiz_attempt import QuizAttempt
+from ..models.quiz_stats import QuizStats
+from .grading import get_answer_key, check_window, grade
+
+
+class AttemptService:
+
+    @staticmethod
+    def get_stats(quiz_id):
+        """
+        Read precomputed stats for a quiz (single _id lookup).
+        """
+        doc = QuizStats.find_by_quiz(quiz_id)
+        if not doc:
+            if not Quiz.find_grading_meta(quiz_id):
+                return None, "Quiz not found"
+            return {"quiz_id": quiz_id, "attempts": 0, "mean": None, "median": None, "histogram": {}}, None
+        return QuizStats.summarize(doc), None
+
+    @staticmethod
+    def submit_attempt(quiz_id, student_id, answers):
+        """
+        Grade and store a student's attempt.
+        Returns (result, error); result carries the score so the client
+        needs no second request.
+        """
+        meta = Quiz.find_grading_meta(quiz_id)
+        if not meta:
+            return None, "Quiz not found"
+
+        error = check_window(meta)
+        if error:
+            return None, error
+
+        key = get_answer_key(quiz_id, meta.get("updated_at"))
+        if key is None:
+            return None, "Quiz not found"
+
+        graded, score, error = grade(key, answers)
+        if error:
+            return None, error
+
+        try:
+            attempt = QuizAttempt(
+                quiz_id=meta["_id"],
+                student_id=student_id,
+                answers=graded,
+                score=score
+            ).save()
+        except Exception as e:
+            return None, str(e)
+
+        QuizStats.record(meta["_id"], score)
+
+        return {
+            "_id": attempt["_id"],
+            "quiz_id": attempt["quiz_id"],
+            "score": score,
+            "total_questions": len(key),
+            "answers": graded,
+            "submitted_at": attempt["submitted_at"]
+        }, None
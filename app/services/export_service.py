@@ -0,0 +1,115 @@
+import csv
+import io
+from datetime import datetime, timezone
+from bson import ObjectId
+from flask import current_app
+from .. import mongo
+
+EXPORT_BATCH_SIZE = 1000
+# Flush to the client once this many bytes are buffered
+CHUNK_BYTES = 64 * 1024
+
+QUIZ_CSV_FIELDS = [
+    "_id", "teacher_id", "title", "class_level", "Subject", "status", "quiz_type",
+    "start_time", "duration_minutes", "question_count", "created_at", "updated_at"
+]
+ATTEMPT_CSV_FIELDS = [
+    "_id", "quiz_id", "student_id", "score", "answer_count", "submitted_at"
+]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return value
+
+
+def ndjson_chunks(docs):
+    """
+    Encode docs one per line with the app's JSON provider, yielding
+    ~CHUNK_BYTES chunks.
+    """
+    dumps = current_app.json.dumps
+    buffer, size = [], 0
+    first = True
+    for doc in docs:
+        line = dumps(doc) + "\n"
+        buffer.append(line)
+        size += len(line)
+        # send the first row right away so the client sees progress
+        if first or size >= CHUNK_BYTES:
+            first = False
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def csv_chunks(docs, fields):
+    """
+    Encode docs as CSV rows (header first), yielding ~CHUNK_BYTES chunks.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    yield out.getvalue()
+    out.seek(0)
+    out.truncate()
+    for doc in docs:
+        writer.writerow([_csv_value(doc.get(field)) for field in fields])
+        if out.tell() >= CHUNK_BYTES:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue()
+
+
+def _summary_pipeline(match, fields, array_field, count_field):
+    project = {field: 1 for field in fields if field != count_field}
+    project[count_field] = {"$size": {"$ifNull": [f"${array_field}", []]}}
+    return [{"$match": match}, {"$project": project}]
+
+
+class ExportService:
+
+    @staticmethod
+    def export_quizzes(fmt, query):
+        """
+        Stream quizzes matching query. NDJSON carries full documents,
+        CSV one summary row per quiz (question_count instead of questions).
+        Returns a generator of text chunks.
+        """
+        if fmt == "csv":
+            cursor = mongo.db.quizzes.aggregate(
+                _summary_pipeline(query, QUIZ_CSV_FIELDS, "questions", "question_count"),
+                batchSize=EXPORT_BATCH_SIZE
+            )
+            return csv_chunks(cursor, QUIZ_CSV_FIELDS)
+
+        cursor = mongo.db.quizzes.find(query).batch_size(EXPORT_BATCH_SIZE)
+        return ndjson_chunks(cursor)
+
+    @staticmethod
+    def export_attempts(fmt, query):
+        """
+        Stream quiz attempts matching query, same formats as export_quizzes.
+        """
+        if fmt == "csv":
+            cursor = mongo.db.quiz_attempts.aggregate(
+                _summary_pipeline(query, ATTEMPT_CSV_FIELDS, "answers", "answer_count"),
+                batchSize=EXPORT_BATCH_SIZE
+            )
+            return csv_chunks(cursor, ATTEMPT_CSV_FIELDS)
+
+        cursor = mongo.db.quiz_attempts.find(query).batch_size(EXPORT_BATCH_SIZE)
+        return ndjson_chunks(cursor)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+from ..models.quiz import Quiz
+from ..utils.cache import TTLCache
+
+# Compiled answer keys keyed by (quiz_id, updated_at). A quiz update bumps
+# updated_at, so stale versions are never served and simply age out.
+answer_key_cache = TTLCache(ttl=3600, maxsize=1024)
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def get_answer_key(quiz_id, version):
+    """
+    Return the {question_text: correct_answer} map for a quiz version,
+    loading only texts and correct answers on a cache miss.
+    """
+    cache_key = (str(quiz_id), version)
+    key = answer_key_cache.get(cache_key)
+    if key is not None:
+        return key
+
+    quiz = Quiz.find_answer_key(quiz_id)
+    if not quiz:
+        return None
+
+    key = {q["text"]: q["correct_answer"] for q in quiz.get("questions", [])}
+    answer_key_cache.set((str(quiz_id), quiz.get("updated_at")), key)
+    return key
+
+
+def check_window(meta, now=None):
+    """
+    Check a scheduled quiz accepts attempts at `now`.
+    Returns an error message or None.
+    """
+    if meta.get("quiz_type") != "scheduled":
+        return None
+
+    start_time = _as_utc(meta.get("start_time"))
+    duration = meta.get("duration_minutes")
+    if not start_time or not duration:
+        return None
+
+    now = now or datetime.now(timezone.utc)
+    if now < start_time:
+        return "Quiz has not started yet"
+    if now > start_time + timedelta(minutes=duration):
+        return "Quiz has ended"
+    return None
+
+
+def grade(key, answers):
+    """
+    Grade answers [{question_text, selected_option}] against an answer key.
+    Returns (graded_answers, score, error).
+    """
+    graded = []
+    seen = set()
+    score = 0
+    for answer in answers:
+        text = answer["question_text"]
+        if text not in key:
+            return None, None, f"Unknown question: {text}"
+        if text in seen:
+            return None, None, f"Duplicate answer for question: {text}"
+        seen.add(text)
+
+        is_correct = key[text] == answer["selected_option"]
+        score += is_correct
+        graded.append({
+            "question_text": text,
+            "selected_option": answer["selected_option"],
+            "is_correct": is_correct
+        })
+    return graded, score, None
@@ -1,98 +1,240 @@
-from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
 from ..models.quiz import Quiz
+from ..utils.cursor import encode_cursor, decode_cursor
 import math
 
+# Public listing: questions without their correct_answer
+LIST_PROJECTION = {
+    "title": 1,
+    "_id": 1,
+    "questions.text": 1,
+    "questions.options": 1,
+    "quiz_type": 1,
+    "start_time": 1,
+    "status": 1,
+    "class_level": 1,
+    "teacher_id": 1
+}
+
+# created_at is needed to build the next cursor
+CURSOR_PROJECTION = {**LIST_PROJECTION, "created_at": 1}
+
+# Public quiz detail; answers are only sent to the owner or an admin
+PUBLIC_DETAIL_PROJECTION = {"questions.correct_answer": 0}
+
+LIST_FILTER_FIELDS = ("teacher_id", "class_level", "Subject", "quiz_type", "status")
+
+# Filter combinations accepted by the listing, each mapped to the compound
+# index (app/db_init/indexes.py) whose prefix serves it. Both sort directions
+# on created_at are covered by walking the index forwards or backwards.
+LIST_FILTER_INDEXES = {
+    frozenset(): "created_desc",
+    frozenset({"teacher_id"}): "teacher_created",
+    frozenset({"class_level"}): "class_level_created",
+    frozenset({"Subject"}): "subject_created",
+    frozenset({"quiz_type"}): "quiz_type_created",
+    frozenset({"status"}): "status_created",
+    frozenset({"class_level", "Subject"}): "class_level_subject_created",
+    frozenset({"class_level", "quiz_type"}): "class_level_quiz_type_created",
+}
 
 class QuizService:
+
+    @staticmethod
+    def build_list_query(params: dict):
+        """
+        Map validated listing params (QuizListQuerySchema) to a Mongo filter
+        and a sort direction. Only index-backed filter combinations are accepted.
+        Returns (query, direction, error).
+        """
+        query = {field: params[field] for field in LIST_FILTER_FIELDS if params.get(field) is not None}
+
+        if frozenset(query) not in LIST_FILTER_INDEXES:
+            return None, None, "Unsupported filter combination: " + ", ".join(sorted(query))
+
+        if "teacher_id" in query:
+            if not ObjectId.is_valid(query["teacher_id"]):
+                return None, None, "Invalid teacher ID"
+            query["teacher_id"] = ObjectId(query["teacher_id"])
+
+        direction = ASCENDING if params.get("sort") == "created_at" else DESCENDING
+        return query, direction, None
     
+    @staticmethod
+    def build_quiz(data: dict):
+        """
+        Build a Quiz from QuizSchema.load() output (start_time is already a
+        datetime, duration_minutes an int), applying the scheduled/anytime
+        rules. Returns (quiz, error).
+        """
+        quiz_type = data.get("quiz_type")
+
+        # Validate conditional fields
+        if quiz_type == "scheduled":
+            if not data.get("start_time") or not data.get("duration_minutes"):
+                return None, "Scheduled quizzes require start_time and duration_minutes"
+
+            duration_minutes = data["duration_minutes"]
+        else:
+            data["start_time"] = None
+            duration_minutes = None
+
+        quiz = Quiz(
+            teacher_id=data["teacher_id"],
+            title=data["title"],
+            status=data["status"],
+            class_level=data["class_level"],
+            quiz_type=quiz_type,
+            questions=data["questions"],
+            description=data.get("description"),
+            start_time=data.get("start_time"),
+            Subject=data["Subject"],
+            duration_minutes=duration_minutes
+        )
+        return quiz, None
+
     @staticmethod
     def create_quiz(data: dict):
         """
         Create a new quiz from request data.
         """
         try:
-            quiz_type = data.get("quiz_type")
-
-            # Validate conditional fields
-            if quiz_type == "scheduled":
-                if not data.get("start_time") or not data.get("duration_minutes"):
-                    return None, "Scheduled quizzes require start_time and duration_minutes"
-
-                # Ensure datetime parsing
-                if isinstance(data["start_time"], str):
-                    data["start_time"] = datetime.fromisoformat(data["start_time"].replace("Z", "+00:00"))
-
-                duration_minutes = int(data["duration_minutes"])
-            else:
-                data["start_time"] = None
-                duration_minutes = None
-
-            quiz = Quiz(
-                teacher_id=data["teacher_id"],
-                title=data["title"],
-                status=data["status"],
-                class_level=data["class_level"],
-                quiz_type=quiz_type,
-                questions=data["questions"],
-                description=data.get("description"),
-                start_time=data.get("start_time"),
-                Subject=data["Subject"],
-                duration_minutes=duration_minutes
-            )
+            quiz, error = QuizService.build_quiz(data)
+            if error:
+                return None, error
 
             return quiz.save(), None
         except Exception as e:
             return None, str(e)
-        
+
+    @staticmethod
+    def bulk_create_quizzes(items: list, validation_errors: dict):
+        """
+        Upsert many quizzes in a single bulk_write.
+        :param items: QuizSchema(many=True).load() output (or the
+            ValidationError's valid_data), index-aligned with the payload
+        :param validation_errors: load errors keyed by item index;
+            those items are skipped
+        :return: summary with per-item errors keyed by payload index
+        """
+        errors = {index: messages for index, messages in validation_errors.items()}
+        quizzes, positions = [], []
+
+        for index, data in enumerate(items):
+            if index in errors:
+                continue
+            try:
+                quiz, error = QuizService.build_quiz(data)
+            except Exception as e:
+                quiz, error = None, str(e)
+            if error:
+                errors[index] = error
+                continue
+            quizzes.append(quiz)
+            positions.append(index)
+
+        summary, write_errors = Quiz.bulk_save(quizzes)
+        for position, message in write_errors.items():
+            errors[positions[position]] = message
+
+        return {
+            "inserted": summary["inserted"],
+            "updated": summary["updated"],
+            "failed": len(errors),
+            "upserted_ids": {positions[p]: _id for p, _id in summary["upserted_ids"].items()},
+            "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)]
+        }
+
+    @staticmethod
+    def can_see_answers(quiz: dict, viewer):
+        """
+        True if viewer (a principal, or None when anonymous) owns the quiz
+        or is an admin.
+        """
+        if viewer is None:
+            return False
+        return "admin" in viewer.get("roles", []) or quiz.get("teacher_id") == viewer["_id"]
+
     @staticmethod
-    def get_quiz_by_id(quiz_id: str):
+    def get_quiz_by_id(quiz_id: str, viewer=None):
         """
-        Fetch a quiz by its ID.
+        Fetch a quiz by its ID. correct_answer is only included when
+        viewer owns the quiz or is an admin.
         """
-        quiz = Quiz.find_by_id(quiz_id)
+        quiz = Quiz.find_by_id(quiz_id, None if viewer else PUBLIC_DETAIL_PROJECTION)
         if not quiz:
             return None, "Quiz not found"
-        # Convert ObjectId to string for JSON response
-        quiz["_id"] = str(quiz["_id"])
-        quiz["teacher_id"] = str(quiz["teacher_id"])
+        if viewer and not QuizService.can_see_answers(quiz, viewer):
+            for question in quiz.get("questions", []):
+                question.pop("correct_answer", None)
+        # ObjectId / datetime are encoded by the app's JSON provider
         return quiz, None
 
     @staticmethod
-    def get_all_quizzes(page=1, limit=10):
+    def get_all_quizzes(page=1, limit=10, count="exact", query=None, direction=DESCENDING):
         """
         Fetch all quizzes with pagination.
+        count selects how the total is computed (exact/approx/none);
+        with "none", total and total_pages are None.
+        query and direction come from build_list_query.
         """
         skip = (page - 1) * limit
+        sort = [("created_at", direction), ("_id", direction)]
 
-        projection = {
-            "title": 1,
-            "_id": 1,
-            "questions": 1,
-            "quiz_type": 1,
-            "start_time": 1,
-            "status": 1,
-            "class_level": 1,
-            "teacher_id": 1
-        }
-
-        quizzes = Quiz.find_paginated(skip, limit, {}, projection)
-
-        total = quizzes.get("total", 0)
-        total_pages = math.ceil(total / limit) if limit > 0 else 1
+        quizzes = Quiz.find_paginated(skip, limit, query or {}, LIST_PROJECTION, count=count, sort=sort)
+        return QuizService.page_result(page, limit, quizzes.get("total"), quizzes["items"])
 
-        # Convert ObjectId to string for JSON
-        for q in quizzes["items"]:
-            q["_id"] = str(q["_id"])
-            if "teacher_id" in q:
-                q["teacher_id"] = str(q["teacher_id"])
+    @staticmethod
+    def page_result(page, limit, total, items):
+        """
+        Response body for an offset page; total is None when not counted.
+        """
+        if total is None:
+            total_pages = None
+        else:
+            total_pages = math.ceil(total / limit) if limit > 0 else 1
 
         return {
             "page": page,
             "limit": limit,
             "total": total,
             "total_pages": total_pages,
-            "quizzes": quizzes["items"]
+            "quizzes": items
+        }
+
+    @staticmethod
+    def get_quizzes_after(cursor=None, limit=10, query=None, direction=DESCENDING):
+        """
+        Fetch quizzes with keyset pagination.
+        query and direction come from build_list_query.
+        Returns (result, error); result carries an opaque next_cursor
+        (None on the last page).
+        """
+        after = None
+        if cursor:
+            after, error = decode_cursor(cursor)
+            if error:
+                return None, error
+
+        quizzes = Quiz.find_after(after, limit, query or {}, CURSOR_PROJECTION, direction=direction)
+        return QuizService.cursor_result(limit, quizzes["items"], quizzes["has_more"]), None
+
+    @staticmethod
+    def cursor_result(limit, items, has_more):
+        """
+        Response body for a keyset page, with the opaque next_cursor
+        (None on the last page).
+        """
+        next_cursor = None
+        if has_more and items:
+            last = items[-1]
+            next_cursor = encode_cursor(last["created_at"], last["_id"])
+
+        return {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "quizzes": items
         }
 
     @staticmethod
@@ -104,8 +246,6 @@ class QuizService:
         if error:
             return None, error
 
-        updated_quiz["_id"] = str(updated_quiz["_id"])
-        updated_quiz["teacher_id"] = str(updated_quiz["teacher_id"])
         return updated_quiz, None
 
     @staticmethod
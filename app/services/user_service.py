@@ -1,12 +1,45 @@
-import random
-from datetime import datetime, timezone
 from flask_mail import Message
-from ..models.user import User
-from .. import bcrypt, mail
+from ..models.user import User, PRIVATE_PROJECTION
+from ..models.otp import OtpCode, VERIFY_EMAIL, RESET_PASSWORD
+from .. import mail
 from ..utils.mailer import send_otp_email
+from ..utils.hashing import hash_password, check_password, needs_rehash
+from ..utils.cursor import encode_cursor, decode_cursor
 
 class UserService:
 
+    @staticmethod
+    def build_list_query(params: dict):
+        """
+        Map validated UserListQuerySchema params to a filter served by the
+        users listing indexes (roles / class_level + created_at).
+        """
+        query = {}
+        if params.get("role"):
+            query["roles"] = params["role"]
+        if params.get("class_level"):
+            query["class_level"] = params["class_level"]
+        return query
+
+    @staticmethod
+    def list_users(query, cursor=None, limit=50):
+        """
+        Keyset-paginated user listing. Returns (result, error).
+        """
+        after = None
+        if cursor:
+            after, error = decode_cursor(cursor)
+            if error:
+                return None, error
+
+        page = User.find_after(after, limit, query)
+        items = page["items"]
+        next_cursor = None
+        if page["has_more"] and items:
+            next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["_id"])
+
+        return {"limit": limit, "next_cursor": next_cursor, "users": items}, None
+
     @staticmethod
     def register(
         email,
@@ -29,10 +62,7 @@ class UserService:
             return None, "User already exists"
 
         # Hash password
-        hashed_pw = bcrypt.generate_password_hash(password).decode("utf-8")
-
-        # Generate OTP
-        otp = str(random.randint(100000, 999999))
+        hashed_pw = hash_password(password)
 
         # Create user object
         user = User(
@@ -43,7 +73,6 @@ class UserService:
             school_institution=school_institution,
             is_active=is_active,
             verified_email=False,
-            otp=otp,
             years_of_experience=years_of_experience,
             location=location,
             phone_number=phone_number,
@@ -51,12 +80,12 @@ class UserService:
             bio=bio
         )
 
-        # Set timezone-aware OTP creation time
-        user.otp_created_at = datetime.now(timezone.utc)
-
         # Save user to DB
         user_data = user.save()
 
+        # Generate OTP
+        otp = OtpCode.issue(email, VERIFY_EMAIL)
+
         # Send OTP email
         success, error = send_otp_email(email, otp)
         if not success:
@@ -71,37 +100,31 @@ class UserService:
         if not user:
             return None, "User not found"
 
-        if not bcrypt.check_password_hash(user["password"], password):
+        if not check_password(user["password"], password):
             return None, "Invalid credentials"
 
         if not user.get("verified_email", False):
             return None, "Email not verified. Please check your inbox for OTP."
 
-        return user, None
+        # Transparently upgrade hashes made with an outdated work factor
+        if needs_rehash(user["password"]):
+            new_hash = hash_password(password)
+            User.update_user(user["_id"], {"password": new_hash}, projection={"_id": 1})
+
+        # Never hand the password hash or OTP fields back to the client
+        return {k: v for k, v in user.items() if k not in PRIVATE_PROJECTION}, None
 
     @staticmethod
     def verify_email(email, otp):
         """Verify user's email with OTP."""
-        user = User.find_by_email(email)
-        if not user:
-            return None, "User not found"
-
-        if user.get("verified_email", False):
-            return None, "Email already verified"
-
-        if user.get("otp") != otp:
-            return None, "Invalid OTP"
-
-        # Optionally check expiration (e.g., OTP valid for 10 minutes)
-        created_at = user.get("otp_created_at")
-        if created_at and (datetime.utcnow() - created_at).seconds > 600:
-            return None, "OTP expired. Please request a new one."
+        ok, error = OtpCode.consume(email, VERIFY_EMAIL, otp)
+        if not ok:
+            return None, error
 
         # Mark as verified
-        user["verified_email"] = True
-        user["otp"] = None  # Clear OTP after successful verification
-        user["otp_created_at"] = None
-        User.update_user(user["_id"],user)
+        user = User.mark_verified(email)
+        if not user:
+            return None, "User not found"
 
         return user, None
     
@@ -111,47 +134,32 @@ class UserService:
         Resend a new OTP to the user's email.
         Returns (user, error_message)
         """
-        user = User.find_by_email(email)
+        user = User.find_principal(email)
         if not user:
             return None, "User not found"
 
         if user.get("verified_email", False):
             return None, "Email already verified"
 
-        # Generate new OTP
-        otp = str(random.randint(100000, 999999))
-        now = datetime.now(timezone.utc)
-
-        # Use your update function instead of raw mongo
-        updated_user = User.update_user(
-            user["_id"],
-            {
-                "otp": otp,
-                "otp_created_at": now,
-                "updated_at": now
-            }
-        )
+        # Generate new OTP (replaces any previous one)
+        otp = OtpCode.issue(email, VERIFY_EMAIL)
 
         # Send email
         success, error = send_otp_email(email, otp)
         if not success:
             return None, f"Failed to send OTP: {error}"
 
-        return updated_user, None
+        return user, None
     
     @staticmethod
     def forgot_password(email):
         """Generate OTP for password reset and send via email."""
-        user = User.find_by_email(email)
+        user = User.find_principal(email)
         if not user:
             return None, "User not found"
 
         # Generate OTP
-        otp = str(random.randint(100000, 999999))
-        now = datetime.now(timezone.utc)
-
-        # Save OTP to user document
-        User.update_user(user["_id"], {"otp": otp, "otp_created_at": now})
+        otp = OtpCode.issue(email, RESET_PASSWORD)
 
         # Send OTP email
         success, error = send_otp_email(email, otp, subject="Password Reset OTP")
@@ -163,26 +171,14 @@ class UserService:
     @staticmethod
     def reset_password(email, otp, new_password):
         """Verify OTP and update user password."""
-        user = User.find_by_email(email)
-        if not user:
-            return None, "User not found"
-
-        if user.get("otp") != otp:
-            return None, "Invalid OTP"
-
-        # Optional: check OTP expiry (e.g., 10 min)
-        created_at = user.get("otp_created_at")
-        if created_at and (datetime.utcnow() - created_at).seconds > 600:
-            return None, "OTP expired. Request a new one."
+        ok, error = OtpCode.consume(email, RESET_PASSWORD, otp)
+        if not ok:
+            return None, error
 
         # Hash new password
-        hashed_pw = bcrypt.generate_password_hash(new_password).decode("utf-8")
+        hashed_pw = hash_password(new_password)
 
-        # Update password and clear OTP
-        User.update_user(user["_id"], {
-            "password": hashed_pw,
-            "otp": None,
-            "otp_created_at": None
-        })
+        if not User.set_password(email, hashed_pw):
+            return None, "User not found"
 
-        return {"msg": "Password reset successfully"}, None
\ No newline at end of file
+        return {"msg": "Password reset successfully"}, None
@@ -0,0 +1,44 @@
+import hashlib
+from datetime import timezone
+from flask import request, make_response
+
+
+def make_etag(*parts):
+    """
+    Strong ETag value (unquoted) derived from the given parts.
+    """
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Evaluate If-None-Match (and If-Modified-Since when no ETag was sent)
+    against the current representation.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    last_modified = _as_utc(last_modified)
+    if last_modified and request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def not_modified(etag, last_modified=None):
+    response = make_response("", 304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = _as_utc(last_modified)
+    # clients must revalidate, but may reuse the body on 304
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+
+
+def encode_cursor(created_at, _id):
+    """
+    Encode the (created_at, _id) of the last returned document
+    into an opaque, URL-safe cursor string.
+    """
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+    Returns ((created_at, ObjectId), error_message).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["c"])
+        if not ObjectId.is_valid(payload["i"]):
+            return None, "Invalid cursor"
+        return (created_at, ObjectId(payload["i"])), None
+    except (ValueError, KeyError, TypeError):
+        return None, "Invalid cursor"
+
+
+def keyset_filter(created_at, _id, direction=-1):
+    """
+    Range filter selecting documents strictly after (created_at, _id)
+    in (created_at, _id) order; direction -1 for descending, 1 for ascending.
+    """
+    op = "$lt" if direction < 0 else "$gt"
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "_id": {op: _id}},
+    ]}
+
+
+def keyset_query(query, after=None, direction=-1):
+    """
+    Restrict query to documents strictly after `after` ((created_at, _id)
+    of the previous page's last doc, or None for the first page).
+    """
+    if after is None:
+        return query
+    range_filter = keyset_filter(*after, direction=direction)
+    return {"$and": [query, range_filter]} if query else range_filter
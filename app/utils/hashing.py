@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .. import bcrypt
+from .metrics import add_phase_time
+
+
+class HashingBusy(Exception):
+    """
+    Raised when the bcrypt pool queue is full; surfaced as HTTP 503.
+    """
+
+
+def _executor_class():
+    # Under gevent, threading is monkey-patched and a plain executor would
+    # run bcrypt on greenlets, blocking the hub; gevent's runs on OS threads.
+    try:
+        from gevent import monkey
+    except ImportError:
+        return ThreadPoolExecutor
+    if monkey.is_module_patched("threading"):
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+        return GeventThreadPoolExecutor
+    return ThreadPoolExecutor
+
+
+class _HashPool:
+    """
+    Size-limited pool for bcrypt work. The bcrypt C extension releases the
+    GIL, so threads give real parallelism while keeping hashing off the
+    request threads' CPU budget. A semaphore bounds in-flight plus queued
+    jobs to apply back-pressure instead of building an unbounded backlog.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.rounds = 12
+        self.queue_timeout = 2.0
+
+    def configure(self, app):
+        workers = app.config["BCRYPT_WORKERS"]
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = _executor_class()(max_workers=workers, thread_name_prefix="bcrypt")
+            self._slots = threading.BoundedSemaphore(workers + app.config["BCRYPT_MAX_QUEUE"])
+        self.rounds = app.config["BCRYPT_LOG_ROUNDS"]
+        self.queue_timeout = app.config["BCRYPT_QUEUE_TIMEOUT"]
+
+    def run(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            if self._executor is None:
+                return fn(*args)
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                raise HashingBusy("Too many concurrent password operations, please retry")
+            try:
+                return self._executor.submit(fn, *args).result()
+            finally:
+                self._slots.release()
+        finally:
+            # queueing included: that is what the request waited for
+            add_phase_time("bcrypt", time.perf_counter() - started)
+
+
+pool = _HashPool()
+
+
+def configure(app):
+    app.config.setdefault("BCRYPT_LOG_ROUNDS", int(os.getenv("BCRYPT_LOG_ROUNDS", 12)))
+    app.config.setdefault("BCRYPT_WORKERS", int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 1)))
+    app.config.setdefault("BCRYPT_MAX_QUEUE", int(os.getenv("BCRYPT_MAX_QUEUE", 64)))
+    app.config.setdefault("BCRYPT_QUEUE_TIMEOUT", float(os.getenv("BCRYPT_QUEUE_TIMEOUT", 2.0)))
+    pool.configure(app)
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured work factor on the bcrypt pool.
+    """
+    return pool.run(lambda: bcrypt.generate_password_hash(password, pool.rounds).decode("utf-8"))
+
+
+def check_password(pw_hash, password):
+    return pool.run(bcrypt.check_password_hash, pw_hash, password)
+
+
+def needs_rehash(pw_hash):
+    """
+    True if pw_hash ("$2b$<cost>$...") was made with a different cost
+    than the configured BCRYPT_LOG_ROUNDS.
+    """
+    try:
+        cost = int(pw_hash.split("$")[2])
+    except (IndexError, ValueError, AttributeError):
+        return True
+    return cost != pool.rounds
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pymongo import CursorType
+from .. import mongo
+
+logger = logging.getLogger(__name__)
+
+# Capped collection used as a lightweight pub/sub bus between workers.
+COLLECTION = "cache_invalidations"
+COLLECTION_SIZE = 1024 * 1024
+
+_handlers = {}
+
+
+def subscribe(channel, handler):
+    """
+    Register handler(key) to be called for every invalidation on channel,
+    whichever worker published it.
+    """
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def _dispatch(channel, key):
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(key)
+        except Exception as e:
+            logger.error("Invalidation handler for %s failed: %s", channel, e)
+
+
+def publish(channel, key):
+    """
+    Invalidate key locally right away, then broadcast it to other workers.
+    """
+    _dispatch(channel, key)
+    try:
+        mongo.db[COLLECTION].insert_one({
+            "channel": channel,
+            "key": key,
+            "created_at": datetime.now(timezone.utc)
+        })
+    except Exception as e:
+        # Other workers fall back on their cache TTL
+        logger.warning("Failed to publish invalidation on %s: %s", channel, e)
+
+
+def ensure_collection(db):
+    """
+    Create the capped collection if missing. A plain collection created
+    by an insert cannot be tailed.
+    """
+    if COLLECTION not in db.list_collection_names():
+        db.create_collection(COLLECTION, capped=True, size=COLLECTION_SIZE)
+
+
+def start_listener(app, retry_delay=1.0):
+    """
+    Tail the capped collection in a daemon thread and dispatch new events.
+    Only events published after the listener starts are delivered.
+    """
+    def run():
+        with app.app_context():
+            coll = mongo.db[COLLECTION]
+            last_id = None
+            positioned = False
+            while True:
+                try:
+                    if not positioned:
+                        # retried like the tail, so a Mongo outage at boot does not kill the thread.
+                        # Create the bus capped before any publish can create it implicitly.
+                        ensure_collection(mongo.db)
+                        last = coll.find_one({}, sort=[("$natural", -1)])
+                        last_id = last["_id"] if last else None
+                        positioned = True
+                    query = {"_id": {"$gt": last_id}} if last_id else {}
+                    cursor = coll.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                    while cursor.alive:
+                        for event in cursor:
+                            last_id = event["_id"]
+                            _dispatch(event["channel"], event["key"])
+                except Exception as e:
+                    logger.warning("Invalidation listener error: %s", e)
+                time.sleep(retry_delay)
+
+    thread = threading.Thread(target=run, name="cache-invalidation", daemon=True)
+    thread.start()
+    return thread
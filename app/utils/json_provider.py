@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timezone
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    Stdlib json provider that also encodes ObjectId, and datetimes as
+    ISO 8601 (naive ones, as returned by PyMongo, are UTC).
+    """
+
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        if isinstance(obj, datetime):
+            if obj.tzinfo is None:
+                obj = obj.replace(tzinfo=timezone.utc)
+            return obj.isoformat()
+        return DefaultJSONProvider.default(obj)
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    orjson-backed provider: datetimes are encoded natively, ObjectId via
+    _default, so raw Mongo documents can be returned without conversion.
+    """
+
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype="application/json"
+        )
+
+
+def dumps_bytes(obj):
+    """
+    Encode obj as the app's provider would, without a Flask app
+    (used by the ASGI read path).
+    """
+    if orjson:
+        return orjson.dumps(obj, default=_default, option=OrjsonProvider.option)
+    return json.dumps(obj, default=MongoJSONProvider.default, separators=(",", ":")).encode("utf-8")
+
+
+def init_json(app):
+    """
+    Use orjson when installed, otherwise the stdlib-based provider.
+    """
+    provider_class = OrjsonProvider if orjson else MongoJSONProvider
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
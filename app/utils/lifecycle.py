@@ -0,0 +1,46 @@
+from pymongo import MongoClient
+from .. import mongo
+
+
+def init_mongo(app, **kwargs):
+    """
+    Initialize the shared PyMongo extension. The client keyword arguments
+    are kept on the app so reconnect_mongo can rebuild an identical client.
+    """
+    kwargs.setdefault("connect", False)
+    app.extensions["mongo_client_kwargs"] = kwargs
+    mongo.init_app(app, **kwargs)
+
+
+def reconnect_mongo(app):
+    """
+    Replace the client inherited from a pre-fork parent with a fresh one.
+    MongoClient is not fork-safe: its pools, monitors and locks belong to
+    the parent. The parent's client is dropped, not closed, since its
+    sockets are still the parent's.
+    """
+    name = mongo.db.name
+    mongo.cx = MongoClient(app.config["MONGO_URI"], **app.extensions["mongo_client_kwargs"])
+    mongo.db = mongo.cx[name]
+
+
+def start_background_tasks(app):
+    """
+    Start the per-process threads: the cache-invalidation listener and the
+    mail queue workers (each holds its own SMTP connection).
+    """
+    from .invalidation import start_listener
+    from .mail_queue import start_workers
+    start_listener(app)
+    start_workers(app)
+
+
+def after_fork(app):
+    """
+    Make a worker forked from a preloaded app usable: new Mongo client,
+    new bcrypt pool, and the background threads, which do not survive fork.
+    """
+    from . import hashing
+    reconnect_mongo(app)
+    hashing.configure(app)
+    start_background_tasks(app)
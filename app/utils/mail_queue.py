@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask_mail import Message
+from pymongo import ReturnDocument
+from .. import mongo, mail
+
+logger = logging.getLogger(__name__)
+
+# Local testing against an SMTP stub:
+#   python -m aiosmtpd -n -l localhost:1025
+#   MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=False
+
+# mail_queue document statuses
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 2
+LEASE_SECONDS = 60
+POLL_SECONDS = 1.0
+IDLE_DISCONNECT_SECONDS = 30
+
+_wakeup = threading.Event()
+
+
+def enqueue(subject, recipients, body, sender):
+    """
+    Durably store an email for the background workers.
+    Returns once the insert is acknowledged.
+    """
+    now = datetime.now(timezone.utc)
+    mongo.db.mail_queue.insert_one({
+        "subject": subject,
+        "recipients": recipients,
+        "body": body,
+        "sender": list(sender) if isinstance(sender, tuple) else sender,
+        "status": PENDING,
+        "attempts": 0,
+        "last_error": None,
+        "next_attempt_at": now,
+        "created_at": now
+    })
+    _wakeup.set()
+
+
+def _claim():
+    """
+    Atomically lease the next due message. Messages whose lease expired
+    (worker died mid-send) are picked up again.
+    """
+    now = datetime.now(timezone.utc)
+    return mongo.db.mail_queue.find_one_and_update(
+        {"status": {"$in": [PENDING, SENDING]}, "next_attempt_at": {"$lte": now}},
+        {"$set": {"status": SENDING, "next_attempt_at": now + timedelta(seconds=LEASE_SECONDS)},
+         "$inc": {"attempts": 1}},
+        sort=[("next_attempt_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _mark_sent(doc):
+    mongo.db.mail_queue.update_one(
+        {"_id": doc["_id"]},
+        {"$set": {"status": SENT, "sent_at": datetime.now(timezone.utc), "last_error": None},
+         "$unset": {"body": ""}}
+    )
+
+
+def _mark_failed(doc, error):
+    if doc["attempts"] >= MAX_ATTEMPTS:
+        # dead-letter record, kept for inspection until the dead_at TTL;
+        # the body may hold an OTP, so it is dropped like on success
+        update = {"$set": {"status": DEAD, "last_error": error, "dead_at": datetime.now(timezone.utc)},
+                  "$unset": {"body": ""}}
+        logger.error("Mail %s dead-lettered after %s attempts: %s", doc["_id"], doc["attempts"], error)
+    else:
+        delay = BACKOFF_BASE_SECONDS ** doc["attempts"]
+        update = {"$set": {
+            "status": PENDING,
+            "last_error": error,
+            "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+        }}
+    mongo.db.mail_queue.update_one({"_id": doc["_id"]}, update)
+
+
+class MailWorker(threading.Thread):
+    """
+    Background sender holding one persistent SMTP connection
+    (mail.connect()), reopened on failure and closed when idle.
+    """
+
+    def __init__(self, app, name):
+        super().__init__(name=name, daemon=True)
+        self.app = app
+        self._conn = None
+        self._last_used = 0.0
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = mail.connect().__enter__()
+        self._last_used = time.monotonic()
+        return self._conn
+
+    def _disconnect(self):
+        if self._conn is not None:
+            try:
+                self._conn.__exit__(None, None, None)
+            except Exception:
+                pass
+            self._conn = None
+
+    def _send(self, doc):
+        sender = doc["sender"]
+        msg = Message(
+            subject=doc["subject"],
+            sender=tuple(sender) if isinstance(sender, list) else sender,
+            recipients=doc["recipients"]
+        )
+        msg.body = doc["body"]
+        try:
+            self._connection().send(msg)
+        except Exception:
+            # drop a possibly broken connection before retrying
+            self._disconnect()
+            raise
+
+    def run(self):
+        with self.app.app_context():
+            while True:
+                try:
+                    doc = _claim()
+                except Exception as e:
+                    logger.warning("Mail queue claim failed: %s", e)
+                    doc = None
+
+                if doc is None:
+                    if self._conn is not None and time.monotonic() - self._last_used > IDLE_DISCONNECT_SECONDS:
+                        self._disconnect()
+                    _wakeup.wait(POLL_SECONDS)
+                    _wakeup.clear()
+                    continue
+
+                try:
+                    self._send(doc)
+                except Exception as e:
+                    self._record(_mark_failed, doc, str(e))
+                else:
+                    self._record(_mark_sent, doc)
+
+    @staticmethod
+    def _record(mark, *args):
+        # a failed status write leaves the lease to expire and the message is retried
+        try:
+            mark(*args)
+        except Exception as e:
+            logger.warning("Mail queue status update failed: %s", e)
+
+
+def start_workers(app):
+    """
+    Start MAIL_QUEUE_WORKERS sender threads (none if 0).
+    """
+    workers = []
+    for i in range(app.config.get("MAIL_QUEUE_WORKERS", 0)):
+        worker = MailWorker(app, name=f"mail-worker-{i}")
+        worker.start()
+        workers.append(worker)
+    return workers
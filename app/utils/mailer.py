@@ -1,5 +1,7 @@
+from flask import current_app
 from flask_mail import Message
 from .. import mail  # mail is initialized in __init__.py (like mongo, jwt, bcrypt)
+from . import mail_queue
 
 def send_email(subject, recipients, body, sender=("MyApp", "no-reply@myapp.com")):
     """
@@ -24,6 +26,21 @@ def send_email(subject, recipients, body, sender=("MyApp", "no-reply@myapp.com")
         return False, str(e)
 
 
+def queue_email(subject, recipients, body, sender=("MyApp", "no-reply@myapp.com")):
+    """
+    Hand an email to the background mail queue (app/utils/mail_queue.py).
+    Returns once it is durably enqueued; falls back to sending inline
+    when MAIL_QUEUE_WORKERS is 0.
+    """
+    if not current_app.config.get("MAIL_QUEUE_WORKERS"):
+        return send_email(subject, recipients, body, sender)
+    try:
+        mail_queue.enqueue(subject, recipients, body, sender)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
 def send_otp_email(email, otp , subject= "Verify your email - MyApp"):
     """
     Helper for sending OTP email.
@@ -40,4 +57,4 @@ def send_otp_email(email, otp , subject= "Verify your email - MyApp"):
     Regards,
     MyApp Team
     """
-    return send_email(subject, [email], body)
+    return queue_email(subject, [email], body)
@@ -0,0 +1,185 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+# Latency buckets in seconds (upper bounds, +Inf implied)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        names = self.label_names + ("le",)
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(names, label_values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, label_values)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, label_values)} {count}")
+        return lines
+
+
+ROUTE_LABELS = ("blueprint", "route", "method")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by blueprint and route.", ROUTE_LABELS
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests by blueprint, route and status.", ROUTE_LABELS + ("status",)
+)
+ERRORS = Counter(
+    "http_request_errors_total", "Requests answered with a 5xx or an unhandled exception.", ROUTE_LABELS
+)
+MONGO_TIME = Histogram(
+    "http_request_mongo_seconds", "Time spent in Mongo commands per request.", ROUTE_LABELS
+)
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total", "Mongo commands issued, by route and command.", ROUTE_LABELS + ("command",)
+)
+PHASE_TIME = Histogram(
+    "http_request_phase_seconds", "Time spent per request in instrumented phases (e.g. bcrypt).",
+    ROUTE_LABELS + ("phase",)
+)
+
+REGISTRY = [REQUEST_LATENCY, REQUESTS, ERRORS, MONGO_TIME, MONGO_COMMANDS, PHASE_TIME]
+
+
+def _route_labels():
+    rule = request.url_rule.rule if request.url_rule else "unmatched"
+    return request.blueprint or "", rule, request.method
+
+
+def add_phase_time(phase, seconds):
+    """
+    Attribute time spent in a phase (e.g. "bcrypt") to the current request.
+    No-op outside a request.
+    """
+    if has_request_context() and "metrics_phases" in g:
+        g.metrics_phases[phase] = g.metrics_phases.get(phase, 0.0) + seconds
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Attributes Mongo command time and counts to the request running in the
+    issuing thread (PyMongo publishes events synchronously).
+    """
+
+    def started(self, event):
+        pass
+
+    def _record(self, event):
+        if has_request_context() and "metrics_mongo_time" in g:
+            g.metrics_mongo_time += event.duration_micros / 1e6
+            g.metrics_mongo_commands.append(event.command_name)
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+
+mongo_listener = MongoCommandListener()
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app):
+    """
+    Install per-request timing hooks. The Mongo listener itself must be
+    passed to the client (see create_app).
+    """
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_mongo_time = 0.0
+        g.metrics_mongo_commands = []
+        g.metrics_phases = {}
+
+    @app.after_request
+    def _record_request(response):
+        if "metrics_start" not in g:
+            return response
+        labels = _route_labels()
+        REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_start, *labels)
+        REQUESTS.inc(*labels, str(response.status_code))
+        if response.status_code >= 500:
+            ERRORS.inc(*labels)
+        MONGO_TIME.observe(g.metrics_mongo_time, *labels)
+        for command in g.metrics_mongo_commands:
+            MONGO_COMMANDS.inc(*labels, command)
+        for phase, seconds in g.metrics_phases.items():
+            PHASE_TIME.observe(seconds, *labels, phase)
+        g.pop("metrics_start")
+        return response
+
+    @app.teardown_request
+    def _record_exception(exc):
+        # after_request does not run for unhandled exceptions
+        if exc is not None and "metrics_start" in g:
+            labels = _route_labels()
+            REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_start, *labels)
+            REQUESTS.inc(*labels, "500")
+            ERRORS.inc(*labels)
@@ -0,0 +1,191 @@
+import os
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from pymongo import monitoring
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from .cache import TTLCache
+from .invalidation import publish, subscribe
+from .. import mongo
+
+# Commands whose reply operationTime marks a write the caller must be able to read back
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify"}
+CHANNEL = "write_times"
+
+# identity -> (operation_time, cluster_time) of the caller's latest write.
+# Only needs to outlive secondary replication lag.
+write_times = TTLCache(ttl=int(os.getenv("CAUSAL_WINDOW_SECONDS", 60)), maxsize=10000)
+
+_read_preference = None
+
+
+def mongo_settings():
+    """
+    MONGO_* settings from the environment, shared by create_app and the
+    ASGI read app.
+    """
+    return {
+        "MONGO_URI": os.getenv("MONGO_URI"),
+        # Client pool/timeouts/compression; unset values keep the driver defaults
+        "MONGO_MAX_POOL_SIZE": int(os.getenv("MONGO_MAX_POOL_SIZE", 100)),
+        "MONGO_MIN_POOL_SIZE": int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "MONGO_SERVER_SELECTION_TIMEOUT_MS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+        "MONGO_COMPRESSORS": os.getenv("MONGO_COMPRESSORS"),
+        "MONGO_WRITE_CONCERN": os.getenv("MONGO_WRITE_CONCERN", "majority"),
+        "MONGO_WTIMEOUT_MS": os.getenv("MONGO_WTIMEOUT_MS"),
+        # Where quiz listing/detail reads go, e.g. "secondaryPreferred"
+        "MONGO_READ_PREFERENCE": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+    }
+
+
+def read_preference(mode):
+    """
+    ReadPreference for a mode name, or None for "primary".
+    """
+    if mode == "primary":
+        return None
+    return make_read_preference(read_pref_mode_from_name(mode), None)
+
+
+def client_options(config):
+    """
+    Keyword arguments for MongoClient from MONGO_* config: pool sizing,
+    timeouts, compression and the default write concern. Unset values
+    are left to the driver (or the URI).
+    """
+    options = {
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE"),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "compressors": config.get("MONGO_COMPRESSORS"),
+        "w": config.get("MONGO_WRITE_CONCERN"),
+        "wTimeoutMS": config.get("MONGO_WTIMEOUT_MS"),
+    }
+    options = {k: v for k, v in options.items() if v not in (None, "")}
+    for key, value in options.items():
+        if key != "compressors" and str(value).isdigit():
+            options[key] = int(value)
+    return options
+
+
+def _remember(identity, times):
+    current = write_times.get(identity)
+    if current is None or times[0] > current[0]:
+        write_times.set(identity, times)
+
+
+def _on_remote_write(key):
+    _remember(key["identity"], (key["operation_time"], key["cluster_time"]))
+
+
+class WriteTimeListener(monitoring.CommandListener):
+    """
+    Keeps the operationTime/$clusterTime of the latest write issued by the
+    current request, so later secondary reads by the same caller can wait
+    for it (see causal_reads).
+    """
+
+    def started(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name not in WRITE_COMMANDS or not has_request_context():
+            return
+        operation_time = event.reply.get("operationTime")
+        cluster_time = event.reply.get("$clusterTime")
+        if operation_time is None or cluster_time is None:
+            return  # standalone server: no causal consistency to track
+        latest = g.get("mongo_write_time")
+        if latest is None or operation_time > latest[0]:
+            g.mongo_write_time = (operation_time, cluster_time)
+
+
+write_time_listener = WriteTimeListener()
+
+
+def init_read_routing(app):
+    """
+    Route causal_reads views to MONGO_READ_PREFERENCE. With the default
+    "primary" nothing changes.
+    """
+    global _read_preference
+    _read_preference = read_preference(app.config.get("MONGO_READ_PREFERENCE", "primary"))
+    if _read_preference is None:
+        return
+    subscribe(CHANNEL, _on_remote_write)
+
+    @app.after_request
+    def _share_write_time(response):
+        times = g.pop("mongo_write_time", None)
+        if times is None:
+            return response
+        try:
+            identity = get_jwt_identity()
+        except RuntimeError:
+            identity = None
+        if identity is not None:
+            # Other workers may serve this caller's next read
+            publish(CHANNEL, {"identity": identity, "operation_time": times[0], "cluster_time": times[1]})
+        return response
+
+
+def read_db():
+    """
+    Database handle for routed reads: inside a causal_reads view, the
+    configured read preference with majority read concern; elsewhere the
+    plain primary handle.
+    """
+    if _read_preference is None or read_session() is None:
+        return mongo.db
+    return mongo.db.with_options(read_preference=_read_preference, read_concern=ReadConcern("majority"))
+
+
+def read_session():
+    """
+    The causal session opened by causal_reads for this request, if any.
+    """
+    return g.get("read_session") if has_request_context() else None
+
+
+@contextmanager
+def _causal_session():
+    identity = None
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        pass  # bad or missing token: anonymous read, the view decides
+
+    with mongo.cx.start_session(causal_consistency=True) as session:
+        times = write_times.get(identity) if identity is not None else None
+        if times:
+            # reads in this session wait until the caller's last write is visible
+            session.advance_cluster_time(times[1])
+            session.advance_operation_time(times[0])
+        yield session
+
+
+def causal_reads(fn):
+    """
+    Run a read-only view with reads routed by read_db()/read_session():
+    one causal session per request, advanced to the caller's latest write
+    so teachers read their own writes from secondaries.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _read_preference is None:
+            return fn(*args, **kwargs)
+        with _causal_session() as session:
+            g.read_session = session
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                g.pop("read_session", None)
+    return wrapper
@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+from flask import has_request_context, request
+from pymongo import monitoring
+from .. import mongo
+
+logger = logging.getLogger(__name__)
+
+# Commands explain accepts; everything else (getMore, insert, ...) is only timed
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+# Session/cluster fields the driver adds, which explain must not receive
+DRIVER_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+MAX_PENDING = 100
+
+
+def _stages(plan):
+    """
+    Yield every stage name in a (possibly nested) explain plan.
+    """
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+def _planner(explain):
+    # aggregate nests the find layer under its first $cursor stage
+    if "queryPlanner" in explain:
+        return explain.get("queryPlanner", {}), explain.get("executionStats", {})
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("queryPlanner", {}), stage["$cursor"].get("executionStats", {})
+    return {}, {}
+
+
+def summarize_explain(explain):
+    """
+    Reduce an executionStats explain to the fields worth logging:
+    winning plan stages, docs/keys examined, docs returned, COLLSCAN flag.
+    """
+    planner, stats = _planner(explain)
+    stages = list(_stages(planner.get("winningPlan", {})))
+    return {
+        "plan": ">".join(stages) or "unknown",
+        "collscan": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+
+def _explainable(command_name, command):
+    if command_name not in EXPLAINABLE:
+        return False
+    # explain would not run the write stages, but skip them anyway
+    if command_name == "aggregate":
+        return not any("$out" in stage or "$merge" in stage for stage in command.get("pipeline", []))
+    return True
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    Logs commands slower than threshold_ms with their originating route.
+    Explainable ones are re-run with explain("executionStats") on a
+    background thread so the request never waits for it.
+    """
+
+    def __init__(self, threshold_ms, explain=True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._commands = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=MAX_PENDING)
+        self._thread = None
+
+    def _key(self, event):
+        return event.connection_id, event.request_id
+
+    def started(self, event):
+        if event.command_name == "explain":
+            return
+        command = {k: v for k, v in event.command.items() if not k.startswith("$") and k not in DRIVER_FIELDS}
+        with self._lock:
+            self._commands[self._key(event)] = (event.database_name, command)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            entry = self._commands.pop(self._key(event), None)
+        if entry is None:
+            return
+        millis = event.duration_micros / 1000
+        if millis < self.threshold_ms:
+            return
+
+        route = "-"
+        if has_request_context():
+            route = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        database, command = entry
+        collection = command.get(event.command_name)
+
+        if self.explain and _explainable(event.command_name, command):
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait((event.command_name, database, command, collection, millis, route))
+                return
+            except queue.Full:
+                pass
+        logger.warning(
+            "Slow query %s on %s.%s: %.1fms route=%s",
+            event.command_name, database, collection, millis, route
+        )
+
+    def _ensure_thread(self):
+        # started lazily, so a listener created before fork works in the child
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, daemon=True, name="slow-query-explain")
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            name, database, command, collection, millis, route = self._queue.get()
+            try:
+                explain = mongo.cx[database].command(
+                    {"explain": command, "verbosity": "executionStats"}
+                )
+                summary = summarize_explain(explain)
+            except Exception as e:
+                logger.warning(
+                    "Slow query %s on %s.%s: %.1fms route=%s (explain failed: %s)",
+                    name, database, collection, millis, route, e
+                )
+                continue
+            logger.warning(
+                "Slow query %s on %s.%s: %.1fms route=%s plan=%s collscan=%s "
+                "docs_examined=%s keys_examined=%s returned=%s filter=%s",
+                name, database, collection, millis, route,
+                summary["plan"], summary["collscan"], summary["docs_examined"],
+                summary["keys_examined"], summary["returned"],
+                command.get("filter", command.get("query", command.get("pipeline")))
+            )
+
+
+def slow_query_listeners(app):
+    """
+    Listener list for the Mongo client: empty unless SLOW_QUERY_MS is set.
+    """
+    threshold = app.config.get("SLOW_QUERY_MS")
+    if not threshold:
+        return []
+    return [SlowQueryListener(threshold, explain=app.config.get("SLOW_QUERY_EXPLAIN", True))]
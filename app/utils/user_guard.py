@@ -7,7 +7,7 @@ def role_guard(allowed_roles):
     """
     Guard that checks:
     - JWT is valid
-    - User exists in DB
+    - User exists in DB (slim principal, cached, see User.find_principal)
     - User has one of the allowed roles
     """
     def decorator(fn):
@@ -15,7 +15,7 @@ def role_guard(allowed_roles):
         @jwt_required()
         def wrapper(*args, **kwargs):
             email = get_jwt_identity()
-            user = User.find_by_email(email)
+            user = User.find_principal(email)
 
             if not user:
                 return jsonify({"msg": "User not found"}), 404
@@ -0,0 +1,14 @@
+from app.asgi import create_asgi_app
+
+# Async read path for GET /quiz/quizzes and GET /quiz/quizzes/<id>:
+#
+#     uvicorn asgi:app --workers 4 --port 8001
+#
+# Run it next to the WSGI app and route only those two GETs here, e.g.
+# in nginx:
+#
+#     location = /quiz/quizzes { if ($request_method = GET) { proxy_pass http://asgi; } ... }
+#     location ~ ^/quiz/quizzes/[0-9a-f]{24}$ { ... same ... }
+#
+# Everything else (writes, /quiz/quizzes/mine, auth) stays on gunicorn.
+app = create_asgi_app()
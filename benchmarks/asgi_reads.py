@@ -0,0 +1,73 @@
+"""
+Requests per second on the quiz read endpoints at high connection counts:
+gunicorn/gthread serving wsgi:app versus uvicorn serving asgi:app (async
+PyMongo), same number of worker processes.
+
+    python -m benchmarks.asgi_reads [--concurrency 1000] [--duration 20] \\
+        [--workers 4] [--servers wsgi,asgi]
+
+Both servers use the current environment (MONGO_URI etc.). Point it at a
+seeded database (tests/perf/data.py) and run it from a different
+machine or different cores than the servers, as for benchmarks/load_test.py.
+With --quiz-id unset, the detail endpoint uses the first quiz of the listing.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import urllib.request
+from .load_test import run_load, format_summary, wait_for_port
+
+SERVERS = {
+    "wsgi": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"
+    ],
+    "asgi": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--workers", str(workers),
+        "--no-access-log", "--log-level", "warning", "--backlog", "4096"
+    ],
+}
+
+
+def _first_quiz_id(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/quiz/quizzes?limit=1&count=none") as response:
+        quizzes = json.load(response)["quizzes"]
+    if not quizzes:
+        raise RuntimeError("no quizzes in the database, seed it first")
+    return quizzes[0]["_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--servers", default="wsgi,asgi")
+    parser.add_argument("--list-path", default="/quiz/quizzes?limit=20&count=approx")
+    parser.add_argument("--quiz-id", default=None)
+    parser.add_argument("--port", type=int, default=8770)
+    args = parser.parse_args()
+
+    for name in args.servers.split(","):
+        env = dict(os.environ, PORT=str(args.port), WEB_CONCURRENCY=str(args.workers))
+        server = subprocess.Popen(
+            SERVERS[name](args.port, args.workers), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(args.port)
+            quiz_id = args.quiz_id or _first_quiz_id(args.port)
+            base = f"http://127.0.0.1:{args.port}"
+            for label, path in (("list", args.list_path), ("detail", f"/quiz/quizzes/{quiz_id}")):
+                run_load(base + path, args.concurrency, 3.0)  # warm up pools
+                summary = run_load(base + path, args.concurrency, args.duration)
+                print(format_summary(f"{name}/{label}", summary), flush=True)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Serialize a 1k-quiz listing page with the old path (per-item str() of
+ObjectIds + marshmallow dump + stdlib json) and with the app's JSON provider
+on raw Mongo documents.
+
+    python -m benchmarks.json_provider [--items 1000] [--repeat 20]
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from flask import Flask, json
+from app.schemas.quiz_schema import QuizSchema
+from app.utils.json_provider import MongoJSONProvider, OrjsonProvider, orjson
+
+
+def make_quizzes(n, questions=10):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    quizzes = []
+    for i in range(n):
+        options = [f"option {k}" for k in range(4)]
+        quizzes.append({
+            "_id": ObjectId(),
+            "teacher_id": ObjectId(),
+            "title": f"Quiz {i}",
+            "class_level": random.choice(["O-level", "A-level", "SAT", "IB"]),
+            "status": random.choice(["easy", "medium", "hard"]),
+            "quiz_type": "scheduled",
+            "start_time": now + timedelta(days=i % 30),
+            "created_at": now - timedelta(minutes=i),
+            "questions": [
+                {"text": f"Question {q} of quiz {i}?", "options": options, "correct_answer": options[q % 4]}
+                for q in range(questions)
+            ],
+        })
+    return quizzes
+
+
+def legacy(quizzes, schema):
+    items = [dict(q) for q in quizzes]
+    for q in items:
+        q["_id"] = str(q["_id"])
+        q["teacher_id"] = str(q["teacher_id"])
+    return json.dumps({"quizzes": schema.dump(items)})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    quizzes = make_quizzes(args.items)
+    schema = QuizSchema(many=True)
+    app = Flask(__name__)
+
+    cases = {"legacy (str + marshmallow dump + json)": lambda: legacy(quizzes, schema)}
+    stdlib = MongoJSONProvider(app)
+    cases["MongoJSONProvider (raw docs)"] = lambda: stdlib.dumps({"quizzes": quizzes})
+    if orjson:
+        fast = OrjsonProvider(app)
+        cases["OrjsonProvider (raw docs)"] = lambda: fast.dumps({"quizzes": quizzes})
+
+    with app.app_context():
+        for name, fn in cases.items():
+            best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+            print(f"{name:45s} {best * 1000:8.2f} ms / {args.items}-quiz page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+HTTP load generator plus a worker-model comparison for gunicorn.
+
+Load a running server (keep-alive GETs from one asyncio process, so 1k
+concurrent connections are cheap on the client side):
+
+    python -m benchmarks.load_test run http://127.0.0.1:8000/quiz/quizzes?limit=20 \\
+        [--concurrency 200] [--duration 20] [--token JWT]
+
+Start gunicorn with each worker class in turn and load it:
+
+    python -m benchmarks.load_test compare [--workers sync,gthread,gevent] \\
+        [--path /quiz/quizzes?limit=20] [--concurrency 200] [--duration 20]
+
+`compare` runs `gunicorn -c gunicorn.conf.py wsgi:app` with the current
+environment (MONGO_URI etc.), so point it at a seeded database
+(tests/perf/data.py) that matches production data volume. Run
+the load generator on a different machine from the server, or pin both
+to separate cores with taskset. On the same cores they compete for CPU
+and the numbers mostly measure the client.
+
+Reading the results:
+- sync handles one request per process. Throughput is capped at
+  workers / Mongo latency, and under load p99 grows with queueing.
+- gthread overlaps Mongo round trips on threads, since PyMongo
+  releases the GIL while waiting on the socket. It is the default.
+- gevent overlaps them on greenlets and holds many idle keep-alive
+  connections cheaply. CPU-bound work (bcrypt, JSON encoding) still
+  runs one request at a time per process. bcrypt is sent to OS threads
+  (see app.utils.hashing).
+Compare requests/s at equal p99, not peak requests/s alone.
+
+Harness check, not a production figure. Setup: 1 vCPU, load generator
+on the same core, 3 workers, in-process mongomock instead of a Mongo
+server (so no network wait to overlap), GET /quiz/quizzes?limit=20,
+100 connections, 10 s:
+
+    sync      628 req/s   p50 160 ms   p99 175 ms
+    gthread   831 req/s   p50 138 ms   p99 261 ms
+    gevent    745 req/s   p50  36 ms   p99 380 ms
+
+Re-run `compare` against a real replica set before choosing a worker class.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = None
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    if length is None:
+        raise ValueError("responses must carry Content-Length")
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def _client(host, port, request, deadline, latencies, statuses, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive:
+                # e.g. gunicorn sync workers: reconnecting is part of the cost
+                writer.close()
+                reader = writer = None
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+            errors.append(1)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def _run(url, concurrency, duration, headers):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    lines = [f"GET {path or '/'} HTTP/1.1", f"Host: {parts.netloc}", "Connection: keep-alive"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    request = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    latencies, statuses, errors = [], {}, []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        _client(parts.hostname, parts.port or 80, request, deadline, latencies, statuses, errors)
+        for _ in range(concurrency)
+    ))
+    return latencies, statuses, len(errors)
+
+
+def run_load(url, concurrency=200, duration=20.0, headers=None):
+    """
+    Keep `concurrency` connections busy with GET url for `duration`
+    seconds. Returns a summary dict (rps, p50/p99 in ms, statuses, errors).
+    """
+    latencies, statuses, errors = asyncio.run(_run(url, concurrency, duration, headers or {}))
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else None
+
+    return {
+        "rps": len(latencies) / duration,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else None,
+        "statuses": statuses,
+        "errors": errors,
+    }
+
+
+def format_summary(label, summary):
+    def ms(value):
+        return f"{value:8.1f}" if value is not None else "       -"
+    return (f"{label:10s} {summary['rps']:9.1f} req/s  p50 {ms(summary['p50_ms'])} ms  "
+            f"p99 {ms(summary['p99_ms'])} ms  statuses={summary['statuses']} errors={summary['errors']}")
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not listen on {port} within {timeout}s")
+
+
+def compare(worker_classes, path, concurrency, duration, headers, port, app="wsgi:app", warmup=3.0):
+    results = {}
+    for worker_class in worker_classes:
+        env = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class, PORT=str(port))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", app],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(port)
+            url = f"http://127.0.0.1:{port}{path}"
+            run_load(url, concurrency, warmup, headers)
+            results[worker_class] = run_load(url, concurrency, duration, headers)
+            print(format_summary(worker_class, results[worker_class]), flush=True)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="load a running server")
+    run.add_argument("url")
+
+    cmp = sub.add_parser("compare", help="start gunicorn per worker class and load it")
+    cmp.add_argument("--workers", default="sync,gthread,gevent")
+    cmp.add_argument("--path", default="/quiz/quizzes?limit=20")
+    cmp.add_argument("--port", type=int, default=8765)
+
+    for p in (run, cmp):
+        p.add_argument("--concurrency", type=int, default=200)
+        p.add_argument("--duration", type=float, default=20.0)
+        p.add_argument("--token", help="JWT sent as a Bearer token")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    if args.command == "run":
+        print(format_summary("result", run_load(args.url, args.concurrency, args.duration, headers)))
+    else:
+        compare(args.workers.split(","), args.path, args.concurrency, args.duration, headers, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Validate quiz payloads with 10/100/1000 questions using the legacy nested
+QuestionSchema list, the QuestionListField fast path (QuizSchema) and the
+shape-only path (ShallowQuizSchema, QUIZ_VALIDATOR="db").
+
+    python -m benchmarks.quiz_validation [--repeat 20]
+"""
+import argparse
+import timeit
+from marshmallow import fields, validate
+from app.schemas.quiz_schema import QuestionSchema, QuizSchema, ShallowQuizSchema
+
+
+class LegacyQuizSchema(QuizSchema):
+    questions = fields.List(
+        fields.Nested(QuestionSchema),
+        required=True,
+        validate=validate.Length(min=1, error="At least one question is required."),
+        error_messages={"required": "Questions are required."}
+    )
+
+
+def make_payload(questions):
+    options = ["alpha", "beta", "gamma", "delta"]
+    return {
+        "teacher_id": "64b7f0c2e1d3a4b5c6d7e8f9",
+        "title": "Benchmark quiz",
+        "class_level": "A-level",
+        "status": "medium",
+        "Subject": "Physics",
+        "quiz_type": "scheduled",
+        "start_time": "2026-01-01T09:00:00Z",
+        "duration_minutes": 60,
+        "questions": [
+            {"text": f"Question {i}?", "options": options, "correct_answer": options[i % 4]}
+            for i in range(questions)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    schemas = {
+        "legacy nested": LegacyQuizSchema(),
+        "fast path": QuizSchema(),
+        "shallow (db)": ShallowQuizSchema(),
+    }
+    for size in (10, 100, 1000):
+        payload = make_payload(size)
+        for name, schema in schemas.items():
+            best = min(timeit.repeat(lambda: schema.load(payload), number=1, repeat=args.repeat))
+            print(f"{size:5d} questions  {name:15s} {best * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Time app startup in fresh interpreters: imports plus create_app(), and
+optionally the schema bootstrap that create_app used to run on every boot
+(collections, validators and indexes, now `flask db init/migrate`).
+
+    python -m benchmarks.startup [--repeat 10] [--bootstrap]
+
+Uses MONGO_URI from the environment; create_app itself does not need a
+reachable server, --bootstrap does.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+from app import create_app, mongo
+app = create_app()
+booted = time.perf_counter()
+bootstrap = None
+if {bootstrap}:
+    from app.db_init.schema import migrate_schema
+    with app.app_context():
+        migrate_schema(mongo.db, app.config["QUIZ_VALIDATOR"])
+    bootstrap = time.perf_counter() - booted
+print(json.dumps({{"create_app": booted - started, "bootstrap": bootstrap}}))
+"""
+
+
+def run_once(bootstrap):
+    env = dict(os.environ, MAIL_QUEUE_WORKERS="0")
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017/zoomies_bench")
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(bootstrap=bootstrap)],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--bootstrap", action="store_true",
+                        help="also time the schema bootstrap create_app used to run")
+    args = parser.parse_args()
+
+    runs = [run_once(args.bootstrap) for _ in range(args.repeat)]
+    keys = ["create_app"] + (["bootstrap"] if args.bootstrap else [])
+    for key in keys:
+        times = [run[key] * 1000 for run in runs]
+        print(f"{key:12s} median {statistics.median(times):8.1f} ms   min {min(times):8.1f} ms"
+              f"   ({args.repeat} fresh processes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Gunicorn settings for wsgi:app.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Environment:
+    GUNICORN_WORKER_CLASS  gthread (default) or gevent; sync also works
+    WEB_CONCURRENCY        worker processes (default 2 x cores + 1)
+    GUNICORN_THREADS       threads per gthread worker (default 4)
+    GUNICORN_CONNECTIONS   concurrent connections per gevent worker (default 1000)
+    PORT                   listen port (default 8000)
+
+The app is preloaded in the master, so workers fork with the code already
+imported. Fork-unsafe state (Mongo client, bcrypt pool, invalidation
+listener and mail worker threads with their SMTP connections) is rebuilt
+in each worker by post_worker_init, see app.utils.lifecycle.after_fork.
+
+Each worker owns a Mongo pool of up to MONGO_MAX_POOL_SIZE connections,
+so the server sees up to workers x MONGO_MAX_POOL_SIZE of them.
+
+benchmarks/load_test.py compares the worker models.
+"""
+import multiprocessing
+import os
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # Patch before the preloaded app imports socket/ssl/threading
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+preload_app = True
+
+cores = multiprocessing.cpu_count()
+workers = int(os.getenv("WEB_CONCURRENCY", cores * 2 + 1))
+# Mongo calls release the GIL, so a few threads per process keep the CPU busy
+threads = int(os.getenv("GUNICORN_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.getenv("GUNICORN_CONNECTIONS", 1000))
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then to bound slow leaks
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    from app.utils.lifecycle import after_fork
+    after_fork(worker.wsgi)
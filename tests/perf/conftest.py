@@ -0,0 +1,76 @@
+"""
+Microbenchmarks for services, models and guards.
+
+Requires pytest-benchmark and mongomock. Runs against mongomock by default,
+or against a throwaway mongod when BENCH_MONGO_URI is set. Emails are stubbed.
+
+    pytest tests/perf
+    pytest-benchmark compare          # diff the saved runs
+
+Every run is autosaved as JSON under .benchmarks/ (named after the commit),
+so regressions can be diffed between commits.
+"""
+import os
+import pytest
+
+BENCH_PASSWORD = "bench-password"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # same as passing --benchmark-autosave (file named after the commit)
+    if hasattr(config.option, "benchmark_autosave") and not config.option.benchmark_json:
+        from pytest_benchmark.utils import get_tag
+        config.option.benchmark_autosave = config.option.benchmark_autosave or get_tag()
+
+
+@pytest.fixture(scope="session")
+def app():
+    mongo_uri = os.getenv("BENCH_MONGO_URI")
+    patches = pytest.MonkeyPatch()
+    patches.setenv("MONGO_URI", mongo_uri or "mongodb://localhost:27017/zoomies_bench")
+    patches.setenv("MAIL_QUEUE_WORKERS", "0")
+    patches.setenv("BCRYPT_LOG_ROUNDS", os.getenv("BENCH_BCRYPT_ROUNDS", "12"))
+
+    if not mongo_uri:
+        mongomock = pytest.importorskip("mongomock")
+        import flask_pymongo
+        from app.utils import invalidation
+        patches.setattr(flask_pymongo, "MongoClient", mongomock.MongoClient)
+        # mongomock does not support tailable cursors
+        patches.setattr(invalidation, "start_listener", lambda app: None)
+
+    from app import create_app
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app
+
+    from app import mongo
+    mongo.cx.drop_database(mongo.db.name)
+    patches.undo()
+
+
+@pytest.fixture(scope="session")
+def seeded(app):
+    from app import mongo
+    from app.db_init.indexes import ensure_indexes
+    from app.db_init.schema import META_COLLECTION, SCHEMA_VERSION
+    from app.utils.hashing import hash_password
+    from .data import seed
+    with app.app_context():
+        ensure_indexes(mongo.db)
+        # what `flask db init` records (mongomock has no validators), so requests are served
+        mongo.db[META_COLLECTION].update_one(
+            {"_id": "schema"},
+            {"$set": {"version": SCHEMA_VERSION, "quiz_validator": app.config["QUIZ_VALIDATOR"]}},
+            upsert=True
+        )
+        return seed(mongo.db, hash_password(BENCH_PASSWORD))
+
+
+@pytest.fixture
+def ctx(app, seeded, monkeypatch):
+    from app.services import user_service
+    monkeypatch.setattr(user_service, "send_otp_email", lambda *args, **kwargs: (True, None))
+    with app.test_request_context():
+        yield
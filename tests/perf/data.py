@@ -0,0 +1,76 @@
+import random
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+
+CLASS_LEVELS = ["O-level", "A-level", "SAT", "IB"]
+SUBJECTS = ["Mathematics", "Biology", "Chemistry", "Physics", "English"]
+STATUSES = ["easy", "medium", "hard"]
+
+
+def make_quiz_payload(teacher_id, title, questions=20, rng=random):
+    """
+    Request-shaped quiz payload (as sent to POST /quiz/quizzes).
+    """
+    scheduled = rng.random() < 0.5
+    payload = {
+        "teacher_id": str(teacher_id),
+        "title": title,
+        "description": f"Synthetic quiz {title}",
+        "class_level": rng.choice(CLASS_LEVELS),
+        "status": rng.choice(STATUSES),
+        "Subject": rng.choice(SUBJECTS),
+        "quiz_type": "scheduled" if scheduled else "anytime",
+        "duration_minutes": rng.choice([15, 30, 45, 60]),
+        "questions": [],
+    }
+    if scheduled:
+        payload["start_time"] = (datetime.now(timezone.utc) + timedelta(days=rng.randint(-30, 30))).isoformat()
+    for i in range(questions):
+        options = [f"Option {k} for q{i}" for k in range(4)]
+        payload["questions"].append({
+            "text": f"Question {i} of {title}: what is the value of x{i}?",
+            "options": options,
+            "correct_answer": rng.choice(options),
+        })
+    return payload
+
+
+def make_user_doc(email, roles, password_hash, rng=random):
+    now = datetime.now(timezone.utc)
+    return {
+        "email": email,
+        "password": password_hash,
+        "roles": roles,
+        "class_level": rng.choice(CLASS_LEVELS),
+        "school_institution": "Synthetic School",
+        "is_active": True,
+        "verified_email": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def seed(db, password_hash, teachers=20, students=500, quizzes=2000, questions=20, seed_value=42):
+    """
+    Fill db with a realistic spread of users and quizzes.
+    Returns the inserted teacher, student and quiz ids.
+    """
+    rng = random.Random(seed_value)
+    teacher_docs = [make_user_doc(f"teacher{i}@bench.test", ["teacher"], password_hash, rng) for i in range(teachers)]
+    student_docs = [make_user_doc(f"student{i}@bench.test", ["student"], password_hash, rng) for i in range(students)]
+    teacher_ids = db.users.insert_many(teacher_docs).inserted_ids
+    student_ids = db.users.insert_many(student_docs).inserted_ids
+
+    now = datetime.now(timezone.utc)
+    quiz_docs = []
+    for i in range(quizzes):
+        teacher_id = rng.choice(teacher_ids)
+        doc = make_quiz_payload(teacher_id, f"Quiz {i}", questions, rng)
+        doc["teacher_id"] = ObjectId(teacher_id)
+        doc["start_time"] = datetime.fromisoformat(doc["start_time"]) if "start_time" in doc else None
+        doc["created_at"] = now - timedelta(minutes=i)
+        doc["updated_at"] = doc["created_at"]
+        quiz_docs.append(doc)
+    quiz_ids = db.quizzes.insert_many(quiz_docs).inserted_ids
+
+    return {"teachers": teacher_ids, "students": student_ids, "quizzes": quiz_ids}
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from flask_jwt_extended import create_access_token
+from app.utils.user_guard import role_guard
+
+
+@role_guard(["teacher"])
+def _protected():
+    return "ok"
+
+
+@pytest.mark.parametrize("warm", [False, True], ids=["cold-cache", "warm-cache"])
+def test_role_guard(app, seeded, benchmark, warm):
+    from app.models.user import principal_cache
+
+    with app.app_context():
+        token = create_access_token(identity="teacher1@bench.test")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def guarded_request():
+        if not warm:
+            principal_cache.clear()
+        with app.test_request_context(headers=headers):
+            return _protected()
+
+    assert benchmark(guarded_request) == "ok"
@@ -0,0 +1,64 @@
+import itertools
+import random
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.services.quiz_service import QuizService
+from app.services.user_service import UserService
+from app.schemas.quiz_schema import QuizSchema
+from .conftest import BENCH_PASSWORD
+from .data import make_quiz_payload
+
+_counter = itertools.count()
+
+
+def test_register(ctx, benchmark):
+    def register():
+        return UserService.register(
+            email=f"new{next(_counter)}@bench.test",
+            password=BENCH_PASSWORD,
+            roles=["student"],
+            class_level="A-level"
+        )
+
+    user, error = benchmark(register)
+    assert error is None
+
+
+def test_authenticate(ctx, benchmark):
+    user, error = benchmark(UserService.authenticate, "student1@bench.test", BENCH_PASSWORD)
+    assert error is None
+    assert "password" not in user
+
+
+def test_create_quiz(ctx, seeded, benchmark):
+    schema = QuizSchema()
+    teacher_id = seeded["teachers"][0]
+    rng = random.Random(7)
+
+    def create():
+        payload = make_quiz_payload(teacher_id, f"Bench quiz {next(_counter)}", questions=20, rng=rng)
+        return QuizService.create_quiz(schema.load(payload))
+
+    quiz, error = benchmark(create)
+    assert error is None
+
+
+@pytest.mark.parametrize("page", [1, 50])
+def test_get_all_quizzes(ctx, benchmark, page):
+    result = benchmark(QuizService.get_all_quizzes, page=page, limit=20)
+    assert len(result["quizzes"]) == 20
+
+
+def test_get_quizzes_after(ctx, benchmark):
+    first, _ = QuizService.get_quizzes_after(limit=20)
+    result, error = benchmark(QuizService.get_quizzes_after, cursor=first["next_cursor"], limit=20)
+    assert error is None
+    assert len(result["quizzes"]) == 20
+
+
+def test_get_quiz_by_id(ctx, seeded, benchmark):
+    quiz_id = str(seeded["quizzes"][len(seeded["quizzes"]) // 2])
+    quiz, error = benchmark(QuizService.get_quiz_by_id, quiz_id)
+    assert error is None
@@ -0,0 +1,82 @@
+"""
+Scoring and the scheduled-quiz window (app.services.grading).
+Pure functions; the AttemptService check stubs out the Quiz lookups.
+"""
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from app.services import attempt_service
+from app.services.attempt_service import AttemptService
+from app.services.grading import check_window, grade
+
+KEY = {"1+1": "2", "2+2": "4", "3+3": "6"}
+
+START = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+SCHEDULED = {"quiz_type": "scheduled", "start_time": START, "duration_minutes": 30}
+
+
+def _answer(text, option):
+    return {"question_text": text, "selected_option": option}
+
+
+def test_grade_scores_correct_answers():
+    graded, score, error = grade(KEY, [_answer("1+1", "2"), _answer("2+2", "5"), _answer("3+3", "6")])
+
+    assert error is None
+    assert score == 2
+    assert [a["is_correct"] for a in graded] == [True, False, True]
+    assert graded[1] == {"question_text": "2+2", "selected_option": "5", "is_correct": False}
+
+
+def test_grade_unanswered_questions_score_nothing():
+    graded, score, error = grade(KEY, [_answer("1+1", "2")])
+
+    assert error is None
+    assert score == 1
+    assert len(graded) == 1
+
+
+def test_grade_rejects_unknown_question():
+    assert grade(KEY, [_answer("9+9", "18")]) == (None, None, "Unknown question: 9+9")
+
+
+def test_grade_rejects_duplicate_answers():
+    graded, score, error = grade(KEY, [_answer("1+1", "2"), _answer("1+1", "3")])
+
+    assert graded is None and score is None
+    assert error == "Duplicate answer for question: 1+1"
+
+
+def test_window_ignores_anytime_quizzes():
+    assert check_window({"quiz_type": "anytime"}, now=START - timedelta(days=1)) is None
+
+
+def test_window_before_start():
+    assert check_window(SCHEDULED, now=START - timedelta(seconds=1)) == "Quiz has not started yet"
+
+
+def test_window_open_until_deadline():
+    assert check_window(SCHEDULED, now=START) is None
+    assert check_window(SCHEDULED, now=START + timedelta(minutes=30)) is None
+
+
+def test_window_rejects_late_attempt():
+    assert check_window(SCHEDULED, now=START + timedelta(minutes=30, seconds=1)) == "Quiz has ended"
+
+
+def test_window_naive_start_time_is_utc():
+    meta = {**SCHEDULED, "start_time": START.replace(tzinfo=None)}
+    assert check_window(meta, now=START + timedelta(minutes=31)) == "Quiz has ended"
+
+
+def test_submit_attempt_rejects_late_attempt(monkeypatch):
+    ended = {**SCHEDULED, "_id": ObjectId(), "start_time": datetime.now(timezone.utc) - timedelta(hours=1)}
+    monkeypatch.setattr(attempt_service.Quiz, "find_grading_meta", staticmethod(lambda quiz_id: ended))
+
+    def no_key(*args):
+        raise AssertionError("late attempts must be rejected before grading")
+    monkeypatch.setattr(attempt_service, "get_answer_key", no_key)
+
+    result, error = AttemptService.submit_attempt(str(ended["_id"]), ObjectId(), [_answer("1+1", "2")])
+
+    assert result is None
+    assert error == "Quiz has ended"
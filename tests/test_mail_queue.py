@@ -0,0 +1,150 @@
+"""
+MailWorker against a local aiosmtpd SMTP stub, on mongomock.
+
+Requires aiosmtpd and mongomock. One worker thread and one stub serve
+every test; the stub decides per recipient how many deliveries to reject.
+"""
+import socket
+import time
+from datetime import datetime, timezone
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+mongomock = pytest.importorskip("mongomock")
+
+from app.utils import mail_queue
+
+SENDER = ("Zoomies", "noreply@zoomies.test")
+
+
+class StubHandler:
+    """
+    Accepts every message, except the first failures[recipient] ones,
+    which get a transient 451.
+    """
+
+    def __init__(self):
+        self.delivered = []
+        self.failures = {}
+
+    async def handle_DATA(self, server, session, envelope):
+        recipient = envelope.rcpt_tos[0]
+        if self.failures.get(recipient, 0):
+            self.failures[recipient] -= 1
+            return "451 Try again later"
+        self.delivered.append(envelope)
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def smtp():
+    handler = StubHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture(scope="module")
+def app(smtp):
+    import flask_pymongo
+    from app.utils import invalidation
+    patches = pytest.MonkeyPatch()
+    patches.setenv("MONGO_URI", "mongodb://localhost:27017/zoomies_mail_test")
+    patches.setenv("MAIL_SERVER", smtp.hostname)
+    patches.setenv("MAIL_PORT", str(smtp.port))
+    patches.setenv("MAIL_USE_TLS", "False")
+    patches.setenv("MAIL_USERNAME", "")
+    patches.setenv("MAIL_PASSWORD", "")
+    patches.setenv("MAIL_QUEUE_WORKERS", "0")
+    patches.setattr(flask_pymongo, "MongoClient", mongomock.MongoClient)
+    # mongomock does not support tailable cursors
+    patches.setattr(invalidation, "start_listener", lambda app: None)
+    # fast polling, a short backoff and three attempts keep the retries quick
+    patches.setattr(mail_queue, "POLL_SECONDS", 0.05)
+    patches.setattr(mail_queue, "BACKOFF_BASE_SECONDS", 1.2)
+    patches.setattr(mail_queue, "MAX_ATTEMPTS", 3)
+
+    from app import create_app
+    app = create_app()
+    app.config["TESTING"] = False  # Flask-Mail suppresses sending while testing
+    app.config["MAIL_SUPPRESS_SEND"] = False
+    mail_queue.MailWorker(app, name="mail-worker-test").start()
+    yield app
+    patches.undo()
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = predicate()
+        if result:
+            return result
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+def _enqueue(app, recipient, body="Your code is 123456"):
+    from app import mongo
+    with app.app_context():
+        mail_queue.enqueue("Your code", [recipient], body, SENDER)
+        return mongo.db.mail_queue.find_one({"recipients": recipient})["_id"]
+
+
+def _find(app, message_id, **fields):
+    from app import mongo
+    with app.app_context():
+        return mongo.db.mail_queue.find_one({"_id": message_id, **fields})
+
+
+def _as_utc(value):
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def test_sends_and_drops_body(app, smtp):
+    message_id = _enqueue(app, "ok@zoomies.test")
+
+    doc = _wait_for(lambda: _find(app, message_id, status=mail_queue.SENT))
+    assert doc["attempts"] == 1
+    assert "body" not in doc
+    assert "sent_at" in doc
+    delivered = [e for e in smtp.handler.delivered if e.rcpt_tos == ["ok@zoomies.test"]]
+    assert len(delivered) == 1
+    assert "123456" in delivered[0].content.decode()
+
+
+def test_retries_with_backoff(app, smtp):
+    smtp.handler.failures["flaky@zoomies.test"] = 1
+    enqueued_at = datetime.now(timezone.utc)
+    message_id = _enqueue(app, "flaky@zoomies.test")
+
+    doc = _wait_for(lambda: _find(app, message_id, status=mail_queue.PENDING, attempts=1))
+    assert doc["attempts"] == 1
+    assert "451" in doc["last_error"]
+    assert doc["body"]
+    # next try is scheduled BACKOFF_BASE_SECONDS ** attempts later
+    delay = (_as_utc(doc["next_attempt_at"]) - enqueued_at).total_seconds()
+    assert 1.1 < delay < 1.2 + 1
+
+    doc = _wait_for(lambda: _find(app, message_id, status=mail_queue.SENT))
+    assert doc["attempts"] == 2
+    assert "body" not in doc
+
+
+def test_dead_letters_after_max_attempts(app, smtp):
+    smtp.handler.failures["dead@zoomies.test"] = 100
+    message_id = _enqueue(app, "dead@zoomies.test")
+
+    doc = _wait_for(lambda: _find(app, message_id, status=mail_queue.DEAD))
+    assert doc["attempts"] == mail_queue.MAX_ATTEMPTS
+    assert "451" in doc["last_error"]
+    assert "dead_at" in doc
+    # the OTP must not outlive delivery attempts
+    assert "body" not in doc
+    assert not [e for e in smtp.handler.delivered if e.rcpt_tos == ["dead@zoomies.test"]]
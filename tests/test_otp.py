@@ -0,0 +1,130 @@
+"""
+OtpCode issue/consume on mongomock: single use, expiry, the attempt
+lockout and its reset when a new code is issued.
+
+Requires mongomock.
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from app.models import otp
+from app.models.otp import OtpCode, MAX_ATTEMPTS, VERIFY_EMAIL, RESET_PASSWORD
+
+EMAIL = "student@zoomies.test"
+
+
+@pytest.fixture(scope="module")
+def app():
+    import flask_pymongo
+    from app.utils import invalidation
+    patches = pytest.MonkeyPatch()
+    patches.setenv("MONGO_URI", "mongodb://localhost:27017/zoomies_otp_test")
+    patches.setenv("MAIL_QUEUE_WORKERS", "0")
+    patches.setattr(flask_pymongo, "MongoClient", mongomock.MongoClient)
+    # mongomock does not support tailable cursors
+    patches.setattr(invalidation, "start_listener", lambda app: None)
+
+    from app import create_app
+    app = create_app()
+    yield app
+    patches.undo()
+
+
+@pytest.fixture
+def ctx(app):
+    from app import mongo
+    with app.app_context():
+        mongo.db.otp_codes.delete_many({})
+        yield mongo.db
+
+
+def _wrong(code):
+    return f"{(int(code) + 1) % 900000 + 100000}"
+
+
+def test_code_is_single_use(ctx):
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (True, None)
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (
+        False, "OTP expired or not found. Please request a new one."
+    )
+
+
+def test_code_is_stored_hashed(ctx):
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+
+    doc = ctx.otp_codes.find_one({"email": EMAIL, "purpose": VERIFY_EMAIL})
+    assert code not in doc.values()
+    assert doc["attempts"] == 0
+
+
+def test_code_is_bound_to_purpose(ctx):
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+
+    ok, error = OtpCode.consume(EMAIL, RESET_PASSWORD, code)
+    assert not ok
+    assert error == "OTP expired or not found. Please request a new one."
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (True, None)
+
+
+def test_wrong_code_counts_attempts(ctx):
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, _wrong(code)) == (False, "Invalid OTP")
+    assert ctx.otp_codes.find_one({"email": EMAIL})["attempts"] == 1
+    # a wrong guess does not burn the code
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (True, None)
+
+
+def test_lockout_after_max_attempts(ctx):
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+    for _ in range(MAX_ATTEMPTS):
+        assert OtpCode.consume(EMAIL, VERIFY_EMAIL, _wrong(code)) == (False, "Invalid OTP")
+
+    # even the right code is refused once the attempts are used up
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (
+        False, "Too many attempts. Please request a new OTP."
+    )
+    assert ctx.otp_codes.find_one({"email": EMAIL})["attempts"] == MAX_ATTEMPTS + 1
+
+
+def test_resend_resets_lockout(ctx, monkeypatch):
+    draws = iter([111111, 222222])
+    monkeypatch.setattr(otp.secrets, "randbelow", lambda n: next(draws))
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+    for _ in range(MAX_ATTEMPTS + 1):
+        OtpCode.consume(EMAIL, VERIFY_EMAIL, _wrong(code))
+
+    new_code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+
+    assert ctx.otp_codes.count_documents({"email": EMAIL, "purpose": VERIFY_EMAIL}) == 1
+    # the previous code is replaced, not kept alongside
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (False, "Invalid OTP")
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, new_code) == (True, None)
+
+
+def test_expired_code_is_rejected(ctx):
+    code = OtpCode.issue(EMAIL, VERIFY_EMAIL)
+    ctx.otp_codes.update_one(
+        {"email": EMAIL, "purpose": VERIFY_EMAIL},
+        {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+
+    assert OtpCode.consume(EMAIL, VERIFY_EMAIL, code) == (
+        False, "OTP expired or not found. Please request a new one."
+    )
+    # an expired code is not counted as a failed attempt either
+    assert ctx.otp_codes.find_one({"email": EMAIL})["attempts"] == 0
+
+
+def test_issue_ttl(ctx):
+    before = datetime.now(timezone.utc)
+    OtpCode.issue(EMAIL, VERIFY_EMAIL, ttl_seconds=60)
+
+    expires_at = ctx.otp_codes.find_one({"email": EMAIL})["expires_at"]
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    assert timedelta(seconds=59) < expires_at - before <= timedelta(seconds=61)
@@ -0,0 +1,6 @@
+from app import create_app
+
+# Production entry point: `gunicorn -c gunicorn.conf.py wsgi:app`.
+# Background threads are started per worker by the post_worker_init hook
+# in gunicorn.conf.py, never in the (pre-fork) master.
+app = create_app(start_background=False)